@@ -0,0 +1,232 @@
+import os
+import io
+import base64
+import hashlib
+import threading
+
+from chart_cache import TextCache
+from lru import LRUCache
+
+# =============================================================================
+# 1. INDEX DES PHOTOS JOUEURS
+# =============================================================================
+
+PHOTO_DIR = "Photos"
+
+# Ordre de priorité des extensions (comme l'ancienne recherche)
+PHOTO_EXTENSIONS = [".jpg", ".png", ".jpeg"]
+
+
+def _name_key(name):
+    """Clé de recherche : sans accents, minuscules, espaces normalisés."""
+    # Import local : assets est chargé dès l'écran de connexion (sans pandas)
+    from column_resolver import normalize_label
+    return " ".join(normalize_label(name).split())
+
+def _name_candidates(player_name):
+    # Stratégies de recherche (Nom complet, Nom Prénom, Prénom Nom)
+    parts = str(player_name).strip().split()
+    candidates = [" ".join(parts)]
+    if len(parts) > 1:
+        candidates.append(f"{parts[-1]} {' '.join(parts[:-1])}")
+        candidates.append(f"{' '.join(parts[1:])} {parts[0]}")
+    return [_name_key(c) for c in candidates]
+
+
+class PhotoIndex:
+    """
+    Index nom normalisé -> fichier du dossier Photos.
+    Construit une fois, reconstruit seulement si le mtime du dossier change
+    (ajout, suppression ou renommage d'une photo).
+    """
+
+    def __init__(self, folder=PHOTO_DIR):
+        self.folder = folder
+        self._mtime = None
+        self._by_stem = {}   # clé normalisée du nom -> {extension: chemin}
+        self._keys = []      # (clé normalisée du nom de fichier, chemin), pour la recherche partielle
+        self._memo = {}      # nom joueur -> chemin (ou None)
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime: return
+
+        by_stem, keys = {}, []
+        if mtime is not None:
+            for f in sorted(os.listdir(self.folder)):
+                path = os.path.join(self.folder, f)
+                if not os.path.isfile(path): continue
+                stem, ext = os.path.splitext(f)
+                by_stem.setdefault(_name_key(stem), {})[ext.lower()] = path
+                keys.append((_name_key(f), path))
+        self._by_stem, self._keys, self._memo, self._mtime = by_stem, keys, {}, mtime
+
+    def find(self, player_name):
+        """Chemin de la photo du joueur, ou None."""
+        if not player_name: return None
+        with self._lock:
+            self._refresh()
+            if player_name in self._memo: return self._memo[player_name]
+
+            path = None
+            for cand in _name_candidates(player_name):
+                files = self._by_stem.get(cand)
+                if files:
+                    path = next((files[e] for e in PHOTO_EXTENSIONS if e in files), None)
+                    if path: break
+
+            # Repli : nom contenu dans le nom de fichier (insensible aux accents)
+            if path is None:
+                clean_p = _name_key(player_name)
+                path = next((p for k, p in self._keys if clean_p in k), None)
+
+            self._memo[player_name] = path
+            return path
+
+    def paths(self):
+        with self._lock:
+            self._refresh()
+            return [p for _, p in self._keys]
+
+
+PHOTO_INDEX = PhotoIndex()
+
+def get_best_photo_path(player_name):
+    """Cherche la photo du joueur dans le dossier Photos (via l'index)."""
+    return PHOTO_INDEX.find(player_name)
+
+# =============================================================================
+# 2. MINIATURES PRÉ-REDIMENSIONNÉES (BASE64)
+# =============================================================================
+
+# Côté max en pixels (x2 par rapport à l'affichage pour les écrans haute densité)
+THUMBNAIL_SIZES = {
+    "hero": 220,     # bandeau de la page profilage (110 px)
+    "report": 400,   # rapport HTML (200 px)
+}
+
+THUMBNAIL_DIR = os.path.join(".cache", "miniatures")
+
+# Miniatures gardées sur disque : toutes les variantes de l'effectif, plus une marge pour
+# les photos remplacées (la clé contient le mtime, les anciennes versions finissent évincées)
+THUMBNAIL_DISK_MAX_FILES = 400
+
+# Data URIs déjà encodées (mémoire + disque)
+THUMBNAIL_CACHE = TextCache(max_items=64, disk_dir=THUMBNAIL_DIR, max_disk_items=THUMBNAIL_DISK_MAX_FILES)
+
+
+def _file_data_uri(path):
+    ext = os.path.splitext(path)[1].lower()
+    mime = "image/jpeg" if ext in (".jpg", ".jpeg") else "image/png"
+    with open(path, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode()}"
+
+def _resize_to_data_uri(path, max_side):
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+        buf = io.BytesIO()
+        # PNG si transparence (photos détourées), sinon JPEG bien plus léger
+        if img.mode in ("RGBA", "LA") or "transparency" in img.info:
+            img.save(buf, format="PNG", optimize=True)
+            mime = "image/png"
+        else:
+            img.convert("RGB").save(buf, format="JPEG", quality=85, optimize=True)
+            mime = "image/jpeg"
+    return f"data:{mime};base64,{base64.b64encode(buf.getvalue()).decode()}"
+
+def get_thumbnail_uri(path, variant="hero"):
+    """
+    Data URI de la photo redimensionnée pour la variante demandée.
+    Clé = chemin + mtime + taille du fichier : une photo remplacée est recalculée.
+    Sans Pillow, l'original est encodé tel quel.
+    """
+    if not path: return ""
+    try:
+        st_res = os.stat(path)
+    except OSError:
+        return ""
+    max_side = THUMBNAIL_SIZES.get(variant, THUMBNAIL_SIZES["hero"])
+    raw = f"{os.path.abspath(path)}|{st_res.st_mtime_ns}|{st_res.st_size}|{max_side}"
+    key = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    uri = THUMBNAIL_CACHE.get(key)
+    if uri is not None: return uri
+
+    try:
+        uri = _resize_to_data_uri(path, max_side)
+    except ImportError:
+        uri = _file_data_uri(path)
+    except Exception:
+        try: uri = _file_data_uri(path)
+        except OSError: return ""
+    THUMBNAIL_CACHE.put(key, uri)
+    return uri
+
+def player_photo_uri(player_name, variant="hero"):
+    """Data URI de la miniature du joueur, ou "" s'il n'a pas de photo."""
+    return get_thumbnail_uri(get_best_photo_path(player_name), variant)
+
+def warm_thumbnails(variants=None):
+    """Pré-calcule les miniatures de toutes les photos (ex. avant une génération en lot)."""
+    count = 0
+    for path in PHOTO_INDEX.paths():
+        for variant in (variants or THUMBNAIL_SIZES):
+            if get_thumbnail_uri(path, variant): count += 1
+    return count
+
+# =============================================================================
+# 3. IMAGES STATIQUES (LOGOS) EN MÉMOIRE
+# =============================================================================
+
+# Logo du club, puis ancien nom en secours
+LOGO_CANDIDATES = ["logo_sdr.png", "logo.png"]
+
+# chemin absolu -> (mtime, taille, contenu, base64), LRU bornée
+_ASSETS = LRUCache(max_items=32)
+
+
+def _load_asset(path):
+    if not path: return None
+    abs_path = os.path.abspath(path)
+    try:
+        st_res = os.stat(abs_path)
+    except OSError:
+        return None
+    stamp = (st_res.st_mtime_ns, st_res.st_size)
+    entry = _ASSETS.get(abs_path)
+    if entry and entry[:2] == stamp:
+        return entry
+
+    try:
+        with open(abs_path, "rb") as f: content = f.read()
+    except OSError:
+        return None
+    entry = stamp + (content, base64.b64encode(content).decode())
+    _ASSETS.put(abs_path, entry)
+    return entry
+
+def get_asset_bytes(path):
+    """Contenu d'une image statique (lu une fois tant que le fichier ne change pas), ou None."""
+    entry = _load_asset(path)
+    return entry[2] if entry else None
+
+def get_asset_b64(path):
+    """Image statique encodée en base64 (mise en cache par chemin + mtime), ou ""."""
+    entry = _load_asset(path)
+    return entry[3] if entry else ""
+
+def first_asset_b64(paths):
+    """Base64 du premier fichier existant de la liste."""
+    return next((b for b in (get_asset_b64(p) for p in paths) if b), "")
+
+def logo_b64():
+    return first_asset_b64(LOGO_CANDIDATES)
+
+def logo_bytes():
+    return next((b for b in (get_asset_bytes(p) for p in LOGO_CANDIDATES) if b), None)
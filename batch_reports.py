@@ -0,0 +1,170 @@
+import os
+import io
+import re
+import sys
+import zipfile
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from profiling_report import generate_report, find_column_in_df
+from column_resolver import get_column_resolver
+from percentiles import get_percentile_table, register_percentile_table
+from data_cache import load_profiling_workbook
+from assets import warm_thumbnails
+from player_dataset import get_player_dataset
+from pdf_export import html_to_pdf, pdf_filename, pdf_available
+
+# =============================================================================
+# GÉNÉRATION DES RAPPORTS DE TOUT L'EFFECTIF (EN PARALLÈLE)
+# =============================================================================
+# Usage CLI :
+#   python batch_reports.py
+#   python batch_reports.py --source "Profilage pratiquexlsx.xlsx" -o Rapports.zip --workers 4
+#   python batch_reports.py --format pdf   (nécessite WeasyPrint)
+#   python batch_reports.py --cohorte Poste   (percentiles parmi les joueurs du même poste)
+
+DEFAULT_SOURCES = ["Profilage pratiquexlsx.xlsx", "Profilage.xlsx"]
+
+# Contexte partagé des processus de travail (initialisé une fois par processus)
+_WORKER_DF = None
+
+
+def report_filename(player_name):
+    safe = re.sub(r"[^\w\- ]", "", str(player_name)).strip().replace(" ", "_")
+    return f"Profilage_{safe or 'Joueur'}.html"
+
+def player_report_args(df, row):
+    """En-tête du rapport (poste, latéralité, numéro, anthropométrie), comme sur la page individuelle."""
+    col_poste = find_column_in_df(df, "Poste")
+    col_lat = find_column_in_df(df, "Latéralité")
+    col_num = get_column_resolver(df).number_column()
+    return {
+        "poste": row[col_poste] if col_poste else "-",
+        "laterality": row[col_lat] if col_lat else "-",
+        "number": f"#{int(float(row[col_num]))}" if (col_num and col_num in row and pd.notna(row[col_num])) else "",
+        "anthro_data": {
+            "Taille": row.get('Taille (cm)', '-'),
+            "Poids": row.get('Poids (Kg)', '-'),
+            "Masse Grasse": row.get('Masse grasse Plis (mm)', '-')
+        },
+    }
+
+def _render_player(df, player_name, notes, radar_backend, fmt="html", cohort_by=None):
+    row = get_player_dataset(df).row(player_name)
+    dom, weak, strat = notes
+    html = generate_report(player_name, row, df, dominant_point=dom, weak_point=weak, strat_point=strat,
+                           radar_backend=radar_backend, cohort_by=cohort_by, **player_report_args(df, row))
+    if fmt == "pdf": return pdf_filename(report_filename(player_name)), html_to_pdf(html)
+    return report_filename(player_name), html
+
+def _init_worker(df, table):
+    # Le tableau de percentiles est calculé une seule fois par le processus parent
+    global _WORKER_DF
+    _WORKER_DF = df
+    register_percentile_table(df, table)
+
+def _worker_render(player_name, notes, radar_backend, fmt, cohort_by):
+    return _render_player(_WORKER_DF, player_name, notes, radar_backend, fmt, cohort_by)
+
+def write_reports_zip(df, target, notes=None, max_workers=None, radar_backend="svg", progress=None, fmt="html",
+                      cohort_by=None):
+    """
+    Génère le rapport de chaque joueur et l'écrit dans une archive zip.
+    - target : chemin ou objet fichier (BytesIO, ...)
+    - notes : {joueur: (points forts, axes d'amélioration, stratégie)}
+    - fmt : 'html' ou 'pdf' (rendu PDF dans les processus de travail)
+    - cohort_by : colonne de cohorte des percentiles (ex : Poste), tout l'effectif si None
+    - progress : callback optionnel (nb_terminés, nb_total)
+    Les rapports sont ajoutés à l'archive au fil de l'eau ; un joueur dont le rapport échoue
+    est ignoré sans interrompre les autres.
+    Retourne (nb_rapports_écrits, [(joueur, erreur)] des joueurs ignorés).
+    """
+    notes = notes or {}
+    players = sorted(df['Joueur'].dropna().unique())
+    table = get_percentile_table(df)
+    # Miniatures calculées une fois ici, relues depuis le cache disque par les processus
+    warm_thumbnails(["report"])
+    if max_workers is None:
+        max_workers = min(os.cpu_count() or 1, len(players))
+
+    skipped = []
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        if max_workers <= 1 or len(players) <= 1:
+            for i, p in enumerate(players, 1):
+                try:
+                    name, html = _render_player(df, p, notes.get(p, ("", "", "")), radar_backend, fmt, cohort_by)
+                    zf.writestr(name, html)
+                except Exception as e:
+                    skipped.append((p, str(e)))
+                if progress: progress(i, len(players))
+            return len(players) - len(skipped), skipped
+
+        # 'spawn' : pas de fork d'un processus Streamlit multi-thread
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx,
+                                 initializer=_init_worker, initargs=(df, table)) as pool:
+            futures = {pool.submit(_worker_render, p, notes.get(p, ("", "", "")), radar_backend, fmt, cohort_by): p
+                       for p in players}
+            for i, fut in enumerate(as_completed(futures), 1):
+                try:
+                    name, html = fut.result()
+                    zf.writestr(name, html)
+                except Exception as e:
+                    skipped.append((futures[fut], str(e)))
+                if progress: progress(i, len(players))
+    return len(players) - len(skipped), sorted(skipped)
+
+def generate_all_reports(df, notes=None, max_workers=None, radar_backend="svg", progress=None, fmt="html",
+                         cohort_by=None):
+    """Version en mémoire de write_reports_zip : (contenu de l'archive en bytes, joueurs ignorés)."""
+    buf = io.BytesIO()
+    _, skipped = write_reports_zip(df, buf, notes=notes, max_workers=max_workers, radar_backend=radar_backend,
+                      progress=progress, fmt=fmt, cohort_by=cohort_by)
+    return buf.getvalue(), skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère les rapports de profilage de tout l'effectif (zip).")
+    parser.add_argument("--source", help="Classeur Excel de profilage")
+    parser.add_argument("-o", "--output", default="Rapports_Profilage.zip", help="Archive zip de sortie")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nb de coeurs)")
+    parser.add_argument("--radar", choices=["svg", "png"], default="svg", help="Rendu du radar dans les rapports")
+    parser.add_argument("--format", choices=["html", "pdf"], default="html", help="Format des rapports")
+    parser.add_argument("--cohorte", default=None, help="Colonne de cohorte des percentiles (ex : Poste)")
+    args = parser.parse_args(argv)
+
+    source = args.source or next((f for f in DEFAULT_SOURCES if os.path.exists(f)), None)
+    if not source:
+        print("Fichier de profilage introuvable.", file=sys.stderr)
+        return 1
+    # Mêmes en-têtes que la page de profilage (non strippés)
+    df = load_profiling_workbook(source, strip_columns=False)
+    if df is None or df.empty:
+        print("Colonne 'Joueur' introuvable dans le fichier.", file=sys.stderr)
+        return 1
+
+    if args.format == "pdf" and not pdf_available():
+        print("WeasyPrint n'est pas installé : export PDF impossible (pip install weasyprint).", file=sys.stderr)
+        return 1
+
+    cohort_by = None
+    if args.cohorte:
+        cohort_by = find_column_in_df(df, args.cohorte)
+        if not cohort_by:
+            print(f"Colonne de cohorte introuvable : {args.cohorte}", file=sys.stderr)
+            return 1
+
+    count, skipped = write_reports_zip(df, args.output, max_workers=args.workers, radar_backend=args.radar, fmt=args.format,
+                              cohort_by=cohort_by,
+                              progress=lambda i, n: print(f"\r{i}/{n} rapports", end="", flush=True))
+    print(f"\n{count} rapports écrits dans {args.output}")
+    for player, error in skipped:
+        print(f"Rapport ignoré : {player} ({error})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
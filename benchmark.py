@@ -0,0 +1,283 @@
+import os
+import sys
+import json
+import time
+import inspect
+import argparse
+import datetime
+import platform
+import tempfile
+import statistics
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+from config_rapport import COL_MAPPING, REPORT_NORMES, OFFICIAL_STRUCTURE
+
+# =============================================================================
+# BANC D'ESSAI : EFFECTIFS SYNTHÉTIQUES DE TAILLE VARIABLE
+# =============================================================================
+# Génère des classeurs de profilage et des exports CMJ fictifs (vrais noms de
+# colonnes : COL_MAPPING, ALL_KPI), chronomètre les fonctions de calcul (hors UI)
+# pour chaque taille d'effectif et ajoute les résultats au journal des benchmarks.
+#
+# Usage CLI :
+#   python benchmark.py
+#   python benchmark.py --sizes 25 200 800 --repeat 5 --compare
+
+DEFAULT_SIZES = [25, 100, 400]
+BENCH_LOG = os.path.join(".cache", "benchmarks.jsonl")
+
+POSTES = ["Gardien", "Défenseur central", "Latéral", "Milieu", "Ailier", "Attaquant"]
+CATEGORIES = ["U17", "U19", "Réserve", "Pro"]
+
+# Part des cellules vides / saisies en texte ("12,5") dans les classeurs générés
+MISSING_RATE = 0.05
+TEXT_RATE = 0.03
+
+# =============================================================================
+# 1. DONNÉES SYNTHÉTIQUES
+# =============================================================================
+
+def _metric_values(rng, label, n):
+    low, high = REPORT_NORMES.get(label, [10, 20])
+    mid, spread = (low + high) / 2, (high - low) or abs(low) * 0.1 or 1
+    return np.round(rng.normal(mid, spread, n), 2)
+
+def synthetic_profiling_frame(n_players, seed=0):
+    """Effectif fictif de n_players joueurs, mêmes en-têtes que le classeur de profilage."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Joueur": [f"Joueur {i:04d}" for i in range(1, n_players + 1)],
+        "Catégorie": rng.choice(CATEGORIES, n_players),
+        "Poste": rng.choice(POSTES, n_players),
+        "Latéralité": rng.choice(["Droitier", "Gaucher"], n_players, p=[0.75, 0.25]),
+        "Numéro": rng.integers(1, 99, n_players),
+        "Taille (cm)": np.round(rng.normal(180, 7, n_players), 0),
+        "Poids (Kg)": np.round(rng.normal(76, 7, n_players), 1),
+        "Masse grasse Plis (mm)": np.round(rng.normal(45, 8, n_players), 1),
+    })
+    for label, col in COL_MAPPING.items():
+        values = pd.Series(_metric_values(rng, label, n_players), dtype=object)
+        values[rng.random(n_players) < MISSING_RATE] = None
+        as_text = (rng.random(n_players) < TEXT_RATE) & values.notna().to_numpy()
+        values[as_text] = [f"{v:.1f}".replace(".", ",") for v in values[as_text]]
+        df[col] = values
+    return df
+
+def write_profiling_workbook(df, path):
+    df.to_excel(path, index=False)
+    return path
+
+def write_cmj_csv(player_names, path, sessions=3, trials=3, seed=0):
+    """Export CMJ fictif (séparateur ;) : sessions x essais par joueur, colonnes de ALL_KPI."""
+    from cmj import ALL_KPI
+
+    rng = np.random.default_rng(seed)
+    metrics = sorted(set(ALL_KPI.values()))
+    n = len(player_names) * sessions * trials
+    dates = pd.date_range("2025-07-01", periods=sessions, freq="30D").strftime("%d/%m/%Y")
+    df = pd.DataFrame({
+        "Joueur": np.repeat(player_names, sessions * trials),
+        "Date": np.tile(np.repeat(dates, trials), len(player_names)),
+        "Essai": np.tile(np.arange(1, trials + 1), len(player_names) * sessions),
+    })
+    for m in metrics:
+        df[m] = np.round(np.abs(rng.normal(100, 25, n)), 2)
+    df.to_csv(path, sep=";", index=False)
+    return path
+
+# =============================================================================
+# 2. MESURES
+# =============================================================================
+
+def _measure(func, repeat):
+    """Exécute func repeat fois : (nb d'appels mesurés, [durées en s])."""
+    durations, calls = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        calls = func()
+        durations.append(time.perf_counter() - start)
+    return calls, durations
+
+def _result(size, name, calls, durations):
+    med = statistics.median(durations)
+    return {
+        "taille": size, "mesure": name, "appels": calls,
+        "min_ms": round(min(durations) * 1000, 3),
+        "mediane_ms": round(med * 1000, 3),
+        "par_appel_us": round(med * 1e6 / calls, 2) if calls else None,
+    }
+
+def bench_size(n_players, workdir, repeat=3, n_reports=10, radar_backend="svg", seed=0):
+    """Chronomètre les fonctions de calcul sur un effectif de n_players : liste de résultats."""
+    from profiling import (load_data_from_source, calculate_percentile, get_asymmetry,
+                           create_radar_chart, create_multi_radar_chart)
+    from profiling_report import generate_report
+    from batch_reports import player_report_args
+    from cmj_store import CMJStore
+
+    results = []
+    add = lambda name, calls, durations: results.append(_result(n_players, name, calls, durations))
+
+    # --- Chargement du classeur (Excel à froid, puis cache disque) ---
+    xlsx = write_profiling_workbook(synthetic_profiling_frame(n_players, seed),
+                                    os.path.join(workdir, f"profilage_{n_players}.xlsx"))
+    holder = {}
+    def load():
+        holder["df"], err = load_data_from_source(xlsx)
+        if err: raise RuntimeError(err)
+        return 1
+    add("chargement (Excel)", *_measure(load, 1))
+    def load_cached():
+        data_cache._FRAME_MEMO.clear()
+        return load()
+    add("chargement (cache disque)", *_measure(load_cached, repeat))
+    df = holder["df"]
+
+    # --- Percentiles (premier passage = construction de la table) ---
+    cols = [c for c in COL_MAPPING.values() if c in df.columns]
+    cells = [(c, v) for c in cols for v in df[c]]
+    def percentiles():
+        for c, v in cells: calculate_percentile(df, c, v)
+        return len(cells)
+    add("calculate_percentile (1er passage)", *_measure(percentiles, 1))
+    add("calculate_percentile", *_measure(percentiles, repeat))
+
+    # --- Asymétries G/D ---
+    rows = [row for _, row in df.iterrows()]
+    pair_labels = [l for l in COL_MAPPING if "(G)" in l]
+    def asymmetries():
+        for row in rows:
+            for label in pair_labels: get_asymmetry(row, label, df)
+        return len(rows) * len(pair_labels)
+    add("get_asymmetry", *_measure(asymmetries, repeat))
+
+    # --- Radars : rendu seul (hors cache des graphiques) ---
+    radar_labels = OFFICIAL_STRUCTURE["PROFILAGE ATHLÉTIQUE"]
+    rng = np.random.default_rng(seed)
+    radar_sets = [list(np.round(rng.uniform(0, 100, len(radar_labels)), 1)) for _ in range(min(n_players, 25))]
+    render_radar = inspect.unwrap(create_radar_chart)
+    render_multi = inspect.unwrap(create_multi_radar_chart)
+    for backend in ("svg", "png"):
+        def radars():
+            for values in radar_sets: render_radar(radar_labels, values, backend=backend)
+            return len(radar_sets)
+        def multi_radars():
+            for values in radar_sets:
+                scaled = [v / 20 for v in values]
+                render_multi(radar_labels, scaled, scaled[::-1], [3.0] * len(scaled), backend=backend)
+            return len(radar_sets)
+        try:
+            add(f"radar ({backend})", *_measure(radars, repeat))
+            add(f"radar multi ({backend})", *_measure(multi_radars, repeat))
+        except ImportError as e:
+            print(f"radar {backend} ignoré ({e.name} absent)", file=sys.stderr)
+
+    # --- Rapports HTML ---
+    report_rows = rows[:n_reports]
+    def reports():
+        for row in report_rows:
+            generate_report(row['Joueur'], row, df, dominant_point="", weak_point="", strat_point="",
+                            radar_backend=radar_backend, **player_report_args(df, row))
+        return len(report_rows)
+    add(f"generate_report ({radar_backend})", *_measure(reports, repeat))
+
+    # --- CMJ : import de l'export puis statistiques de groupe ---
+    csv = write_cmj_csv(list(df['Joueur']), os.path.join(workdir, f"cmj_{n_players}.csv"), seed=seed)
+    store = CMJStore(os.path.join(workdir, f"cmj_{n_players}.sqlite"))
+    add("import CMJ", *_measure(lambda: store.ingest(csv)[0], 1))
+    add("statistiques CMJ", *_measure(lambda: len(store.group_stats()), repeat))
+    return results
+
+# =============================================================================
+# 3. JOURNAL ET COMPARAISON
+# =============================================================================
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=3, n_reports=10, radar_backend="svg", seed=0):
+    """Exécute le banc d'essai pour chaque taille : entrée du journal (dict)."""
+    # Caches disque des classeurs générés isolés dans le dossier temporaire
+    cache_dir = data_cache.CACHE_DIR
+    results = []
+    with tempfile.TemporaryDirectory(prefix="sdr_bench_") as workdir:
+        data_cache.CACHE_DIR = os.path.join(workdir, "cache")
+        try:
+            for n in sizes:
+                results += bench_size(n, workdir, repeat=repeat, n_reports=n_reports,
+                                      radar_backend=radar_backend, seed=seed)
+        finally:
+            data_cache.CACHE_DIR = cache_dir
+    return {
+        "ts": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "plateforme": platform.platform(),
+        "tailles": list(sizes),
+        "repetitions": repeat,
+        "resultats": results,
+    }
+
+def read_benchmarks(log_path=BENCH_LOG):
+    try:
+        with open(log_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return []
+
+def append_benchmark(entry, log_path=BENCH_LOG):
+    os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+def compare(previous, current):
+    """(taille, mesure, médiane avant, médiane après, ratio) pour les mesures communes aux deux runs."""
+    before = {(r["taille"], r["mesure"]): r["mediane_ms"] for r in previous["resultats"]}
+    rows = []
+    for r in current["resultats"]:
+        old = before.get((r["taille"], r["mesure"]))
+        if old:
+            rows.append((r["taille"], r["mesure"], old, r["mediane_ms"], r["mediane_ms"] / old))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des fonctions de profilage sur des effectifs synthétiques.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Tailles d'effectif à tester")
+    parser.add_argument("--repeat", type=int, default=3, help="Répétitions par mesure (médiane retenue)")
+    parser.add_argument("--reports", type=int, default=10, help="Nombre de rapports générés par taille")
+    parser.add_argument("--radar", choices=["svg", "png"], default="svg", help="Rendu du radar dans les rapports")
+    parser.add_argument("--seed", type=int, default=0, help="Graine des données synthétiques")
+    parser.add_argument("-o", "--output", default=BENCH_LOG, help="Journal JSON (une ligne par exécution)")
+    parser.add_argument("--compare", action="store_true", help="Compare avec la dernière exécution du journal")
+    args = parser.parse_args(argv)
+
+    previous = read_benchmarks(args.output)
+    entry = run_benchmarks(args.sizes, repeat=args.repeat, n_reports=args.reports,
+                           radar_backend=args.radar, seed=args.seed)
+    append_benchmark(entry, args.output)
+
+    for r in entry["resultats"]:
+        per_call = f"{r['par_appel_us']:>10.1f} µs/appel" if r["par_appel_us"] is not None else ""
+        print(f"{r['taille']:>5}  {r['mesure']:<36} {r['mediane_ms']:>10.1f} ms  {per_call}")
+
+    if args.compare and previous:
+        print(f"\nComparaison avec {previous[-1]['ts']} (commit {previous[-1].get('commit') or '?'}) :")
+        for size, name, old, new, ratio in compare(previous[-1], entry):
+            flag = "  <-- plus lent" if ratio > 1.2 else ""
+            print(f"{size:>5}  {name:<36} {old:>10.1f} -> {new:>10.1f} ms  x{ratio:.2f}{flag}")
+    print(f"\nRésultats ajoutés à {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import os
+import json
+import hashlib
+import threading
+from functools import wraps
+
+from lru import LRUCache
+
+# =============================================================================
+# 1. CACHE DE TEXTE GÉNÉRIQUE (MÉMOIRE + DISQUE)
+# =============================================================================
+# Valeurs textuelles (base64, SVG, data URI) : utilisé pour les graphiques et
+# pour les miniatures des photos (assets.py).
+
+class TextCache:
+    """
+    LRU mémoire bornée de chaînes + tier disque optionnel, avec compteurs de hits/miss.
+    max_disk_items borne le tier disque (fichiers les moins récemment utilisés supprimés).
+    """
+
+    def __init__(self, max_items=128, disk_dir=None, max_disk_items=None):
+        self.max_items = max_items
+        self.disk_dir = disk_dir
+        self.max_disk_items = max_disk_items
+        self._items = LRUCache(max_items)
+        self._lock = threading.Lock()  # compteurs
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.txt")
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            with self._lock: self.hits += 1
+            return value
+
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                    value = f.read()
+                # Date de modification = dernier accès (ordre d'éviction du tier disque)
+                if self.max_disk_items: os.utime(self._disk_path(key))
+                self._items.put(key, value)
+                with self._lock: self.disk_hits += 1
+                return value
+            except OSError:
+                pass
+
+        with self._lock: self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._items.put(key, value)
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                tmp = self._disk_path(key) + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f: f.write(value)
+                os.replace(tmp, self._disk_path(key))
+                if self.max_disk_items: self._prune_disk()
+            except OSError:
+                pass
+
+    def _prune_disk(self):
+        """Supprime les fichiers les moins récemment utilisés au-delà de max_disk_items."""
+        entries = [e for e in os.scandir(self.disk_dir) if e.name.endswith(".txt")]
+        if len(entries) <= self.max_disk_items: return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for e in entries[:len(entries) - self.max_disk_items]:
+            os.remove(e.path)
+
+    def clear(self):
+        self._items.clear()
+        with self._lock:
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0,
+                "items": len(self._items),
+                "max_items": self.max_items,
+                "disk_dir": self.disk_dir,
+                "max_disk_items": self.max_disk_items,
+            }
+
+
+# =============================================================================
+# 2. CACHE DES IMAGES DE GRAPHIQUES (RADARS)
+# =============================================================================
+
+# Nombre d'images gardées en mémoire (une image radar ~ 50-150 Ko en base64)
+MEMORY_MAX_ITEMS = 128
+
+# Tier disque optionnel : activé si la variable d'environnement pointe vers un dossier
+DISK_DIR = os.environ.get("SDR_CHART_CACHE_DIR") or None
+
+CHART_CACHE = TextCache(max_items=MEMORY_MAX_ITEMS, disk_dir=DISK_DIR)
+
+# Backends qui retournent un objet (Figure interactive) : jamais mis en cache ni comptés
+NON_TEXT_BACKENDS = ("plotly",)
+
+def chart_cache_stats():
+    """Compteurs du cache des graphiques (pour le monitoring)."""
+    return CHART_CACHE.stats()
+
+def _chart_key(func, args, kwargs):
+    # Catégories, valeurs, couleurs et dimensions (portées par la fonction et ses arguments)
+    payload = json.dumps([func.__module__, func.__qualname__, args, kwargs],
+                         sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def cached_chart(func):
+    """
+    Décorateur : mémorise l'image base64 retournée par une fonction de graphique,
+    clé = hash des arguments. Les résultats vides ou non textuels ne sont pas mis en cache ;
+    les backends de NON_TEXT_BACKENDS appellent directement la fonction (ni hash, ni compteurs).
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if kwargs.get("backend") in NON_TEXT_BACKENDS: return func(*args, **kwargs)
+        key = _chart_key(func, args, kwargs)
+        cached = CHART_CACHE.get(key)
+        if cached is not None: return cached
+
+        result = func(*args, **kwargs)
+        if isinstance(result, str) and result:
+            CHART_CACHE.put(key, result)
+        return result
+    return wrapper
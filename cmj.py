@@ -2,6 +2,7 @@ import streamlit as st
 import plotly.express as px
 import pandas as pd
 import utils
+from cmj_store import get_cmj_store
 
 # --- 1. DÉFINITION DES INDICATEURS ---
 
@@ -87,20 +88,51 @@ GLOSSARY_DEFINITIONS = {
 }
 
 
-# --- 3. FONCTIONS GRAPHIQUES ---
-
-def chart_team_averages(df, selected_kpis_dict):
+# --- 3. STATISTIQUES DE GROUPE ---
+
+@st.cache_data(show_spinner=False)
+def get_kpi_stats(data_version):
+    """
+    Table d'agrégats des colonnes de ALL_KPI (une ligne par colonne), calculée une fois
+    par version de la base CMJ : n, moyenne, écart-type, moyenne absolue, record et détenteur.
+    Record = minimum pour les données négatives (profondeur, RFD négative), maximum sinon.
+    """
+    stats = get_cmj_store().group_stats(set(ALL_KPI.values()))
+    rows = []
+    for col, s in stats.items():
+        negative = s["mean"] < 0
+        rows.append({
+            "colonne": col, "n": s["n"], "moyenne": s["mean"], "ecart_type": s["std"],
+            "moyenne_abs": abs(s["mean"]),
+            "record": s["min"] if negative else s["max"],
+            "record_joueur": s["player_min"] if negative else s["player_max"],
+        })
+    columns = ["colonne", "n", "moyenne", "ecart_type", "moyenne_abs", "record", "record_joueur"]
+    return pd.DataFrame(rows, columns=columns).set_index("colonne")
+
+
+# --- 4. FONCTIONS GRAPHIQUES ---
+# kpi_stats : table d'agrégats de get_kpi_stats (partagée par les trois graphiques)
+# player_values : valeurs du dernier essai du joueur {métrique: valeur}
+
+def chart_team_averages(kpi_stats, selected_kpis_dict, history=None):
     if not selected_kpis_dict:
         return None
 
+    # Les agrégats couvrent tous les essais importés, pas seulement le dernier fichier
+    if history and history[0]:
+        nb_imports, first, last = history
+        n_max = int(kpi_stats["n"].max()) if len(kpi_stats) else 0
+        period = f", tests du {first[:10]} au {last[:10]}" if first else ""
+        st.caption(f"Historique complet : {n_max} essai(s) sur {nb_imports} import(s){period}.")
+
     cols = st.columns(len(selected_kpis_dict))
     
     for idx, (label, col) in enumerate(selected_kpis_dict.items()):
-        if col in df.columns:
-            raw_mean = df[col].mean()
+        if col in kpi_stats.index:
             # Si donnée négative (ex: profondeur, RFD négatif), on affiche l'absolu pour la moyenne
-            avg_val = abs(raw_mean)
-            std_val = df[col].std()
+            avg_val = kpi_stats.at[col, "moyenne_abs"]
+            std_val = kpi_stats.at[col, "ecart_type"]
             
             with cols[idx]:
                 st.metric(
@@ -110,20 +142,18 @@ def chart_team_averages(df, selected_kpis_dict):
                     delta_color="off"
                 )
 
-def chart_player_profile_normalized(df, player_row, selected_kpis_dict):
+def chart_player_profile_normalized(kpi_stats, player_values, selected_kpis_dict):
     if not selected_kpis_dict:
         return None
 
     data = []
     for label, col in selected_kpis_dict.items():
-        if col in df.columns:
-            val_player = player_row[col]
-            val_avg = df[col].mean()
-            if val_avg == 0: continue
+        if col in kpi_stats.index and col in player_values:
+            calc_avg = kpi_stats.at[col, "moyenne_abs"]
+            if calc_avg == 0: continue
 
             # Absolu pour les négatifs (ex: profondeur)
-            calc_player = abs(val_player)
-            calc_avg = abs(val_avg)
+            calc_player = abs(player_values[col])
             
             pct_diff = ((calc_player - calc_avg) / calc_avg) * 100
             
@@ -134,6 +164,7 @@ def chart_player_profile_normalized(df, player_row, selected_kpis_dict):
                 "Moyenne Groupe": calc_avg
             })
 
+    if not data: return None
     df_chart = pd.DataFrame(data)
     # Couleur : Noir si performance > moyenne, Rouge si < moyenne
     df_chart['Couleur'] = df_chart['Différence %'].apply(lambda x: '#000000' if x >= 0 else '#C0392B')
@@ -159,34 +190,20 @@ def chart_player_profile_normalized(df, player_row, selected_kpis_dict):
     return fig
 
 
-def chart_phase_detail(df, player_row, col_name, label):
-    if col_name not in df.columns:
+def chart_phase_detail(kpi_stats, player_values, col_name, label):
+    if col_name not in kpi_stats.index:
         return None
 
-    # 1. Analyse de la donnée
-    avg_raw = df[col_name].mean()
-    is_negative_data = avg_raw < 0
-    
-    # 2. Récupération du Record et du Nom
-    try:
-        if is_negative_data:
-            idx_record = df[col_name].idxmin()
-        else:
-            idx_record = df[col_name].idxmax()
-            
-        record_val_raw = df.loc[idx_record, col_name]
-        record_name = df.loc[idx_record, 'Joueur']
-        
-        if len(str(record_name)) > 15:
-            record_name = str(record_name)[:12] + "..."
-            
-    except:
-        record_val_raw = 0
-        record_name = "?"
+    # 1. Record et détenteur (pré-calculés dans la table d'agrégats)
+    record_val_raw = kpi_stats.at[col_name, "record"]
+    record_name = kpi_stats.at[col_name, "record_joueur"]
+    if pd.isna(record_val_raw): record_val_raw, record_name = 0, "?"
+    if len(str(record_name)) > 15:
+        record_name = str(record_name)[:12] + "..."
 
-    # 3. Valeurs Absolues pour l'affichage graphique
-    val_player_abs = abs(player_row[col_name])
-    val_avg_abs = abs(avg_raw)
+    # 2. Valeurs Absolues pour l'affichage graphique
+    val_player_abs = abs(player_values.get(col_name, 0))
+    val_avg_abs = kpi_stats.at[col_name, "moyenne_abs"]
     val_record_abs = abs(record_val_raw)
 
     label_record_display = f"Record<br>({record_name})"
@@ -220,7 +237,7 @@ def chart_phase_detail(df, player_row, col_name, label):
     return fig
 
 
-# --- 4. PAGE PRINCIPALE ---
+# --- 5. PAGE PRINCIPALE ---
 
 def show_page():
     st.title("Analyse CMJ : Profilage Physique")
@@ -229,27 +246,31 @@ def show_page():
     st.markdown("### 📂 Chargement des Données")
     uploaded_file = st.file_uploader("Mettre à jour le fichier 'MASTER_CMJ_COMPLET.csv' ici (Prioritaire)", type=["csv"])
     
-    df = pd.DataFrame()
+    store = get_cmj_store()
 
+    # Le CSV n'est lu qu'une fois : les essais sont ajoutés à la base locale (doublons ignorés)
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file, sep=";")
+            # Lecture par blocs des seules colonnes KPI (+ Joueur, date, n° d'essai)
+            added, updated, duplicates = store.ingest(uploaded_file, metrics=ALL_KPI.values())
+            if added or updated or duplicates:
+                st.success(f"✅ {added} nouvel(s) essai(s) importé(s), {updated} essai(s) corrigé(s), "
+                           f"{duplicates} doublon(s) ignoré(s).")
         except Exception as e:
             st.error(f"Erreur lecture CSV : {e}")
     else:
-        df = utils.load_cmj_data()
-        if not df.empty:
-            st.info("ℹ️ Utilisation du fichier local 'MASTER_CMJ_COMPLET.csv'.")
+        try:
+            if utils.load_cmj_data(metrics=ALL_KPI.values()):
+                st.info("ℹ️ Utilisation du fichier local 'MASTER_CMJ_COMPLET.csv'.")
+        except Exception as e:
+            st.error(f"Erreur lecture CSV : {e}")
     
-    if df.empty:
+    if store.is_empty():
         st.warning("⚠️ Aucun fichier CMJ valide chargé. Veuillez uploader le CSV.")
         return
 
-    df.columns = df.columns.str.strip()
-
-    if 'Joueur' not in df.columns:
-        st.error(f"La colonne 'Joueur' est introuvable. Colonnes dispos : {list(df.columns)}")
-        return
+    # Agrégats de groupe : une table par version de la base, partagée par tous les graphiques
+    kpi_stats = get_kpi_stats(store.data_version())
 
     # -------------------------------------------------------------------------
     # PARTIE 1 : RÉFÉRENCES
@@ -268,8 +289,8 @@ def show_page():
     )
     selected_kpis = {k: ALL_KPI[k] for k in selected_labels}
 
-    st.markdown("##### Moyennes du Groupe (Valeurs Absolues)")
-    chart_team_averages(df, selected_kpis)
+    st.markdown("##### Moyennes du Groupe (Valeurs Absolues, historique complet)")
+    chart_team_averages(kpi_stats, selected_kpis, store.trial_history())
 
     st.markdown("---")
 
@@ -278,14 +299,16 @@ def show_page():
     # -------------------------------------------------------------------------
     st.markdown("### 2. Focus Joueur")
     
-    joueurs_list = sorted(df['Joueur'].dropna().unique())
+    joueurs_list = store.players()
     selected_player = st.selectbox("Sélectionner un joueur :", options=joueurs_list)
     
-    player_data = df[df['Joueur'] == selected_player].iloc[-1]
+    # Dernier essai du joueur
+    player_data = store.latest_trial(selected_player)
 
     if selected_kpis:
         st.caption("Barres Noires = Au-dessus de la moyenne (en valeur absolue).")
-        st.plotly_chart(chart_player_profile_normalized(df, player_data, selected_kpis), use_container_width=True, key="profile_chart")
+        fig = chart_player_profile_normalized(kpi_stats, player_data, selected_kpis)
+        if fig: st.plotly_chart(fig, use_container_width=True, key="profile_chart")
     else:
         st.warning("Veuillez sélectionner des indicateurs ci-dessus.")
 
@@ -310,7 +333,7 @@ def show_page():
     for i, (tab, kpi_dict, phase_name) in enumerate(phases_map):
         with tab:
             # 1. Affichage des graphiques
-            valid_kpis = {k: v for k, v in kpi_dict.items() if v in df.columns}
+            valid_kpis = {k: v for k, v in kpi_dict.items() if v in kpi_stats.index}
             
             if not valid_kpis:
                 st.info("Pas de données disponibles pour cette phase.")
@@ -318,7 +341,7 @@ def show_page():
                 cols = st.columns(2)
                 for index, (label, col_name) in enumerate(valid_kpis.items()):
                     with cols[index % 2]:
-                        fig = chart_phase_detail(df, player_data, col_name, label)
+                        fig = chart_phase_detail(kpi_stats, player_data, col_name, label)
                         if fig:
                             st.plotly_chart(fig, use_container_width=True, key=f"chart_{i}_{index}_{label}")
 
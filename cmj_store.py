@@ -0,0 +1,411 @@
+import os
+import codecs
+import hashlib
+import sqlite3
+import datetime
+import threading
+
+import pandas as pd
+
+from numeric import clean_numeric_series
+
+# =============================================================================
+# 1. BASE LOCALE DES ESSAIS CMJ (SQLITE)
+# =============================================================================
+# Les exports de la plateforme de force sont lus une seule fois puis stockés
+# essai par essai (joueur, date, n° d'essai). Un fichier déjà importé est ignoré,
+# un essai déjà présent n'est pas dupliqué : il est identifié par (joueur, date, n° d'essai)
+# et remplacé si un réexport corrige ses valeurs ; sans date ni n° d'essai, par ses valeurs.
+# Les fichiers sont lus par blocs (mémoire bornée) ; les agrégats par joueur sont
+# mis à jour bloc par bloc et les statistiques de groupe en sont déduites.
+
+CMJ_DB = "cmj_essais.sqlite"
+CMJ_MASTER_CSV = "MASTER_CMJ_COMPLET.csv"
+
+# Colonnes d'identification reconnues (insensible à la casse)
+DATE_COLUMNS = ["date", "date du test", "date/heure", "horodatage", "timestamp"]
+TRIAL_COLUMNS = ["essai", "n° essai", "trial", "répétition", "rep"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cmj_imports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    empreinte TEXT NOT NULL UNIQUE,
+    nom TEXT,
+    importe_le TEXT NOT NULL,
+    nb_essais INTEGER
+);
+CREATE TABLE IF NOT EXISTS cmj_essais (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    joueur TEXT NOT NULL,
+    date TEXT,
+    essai INTEGER,
+    empreinte TEXT NOT NULL UNIQUE,
+    import_id INTEGER REFERENCES cmj_imports(id)
+);
+CREATE INDEX IF NOT EXISTS idx_cmj_essais_joueur ON cmj_essais (joueur, date, essai);
+CREATE TABLE IF NOT EXISTS cmj_valeurs (
+    metrique TEXT NOT NULL,
+    essai_id INTEGER NOT NULL REFERENCES cmj_essais(id),
+    valeur REAL NOT NULL,
+    PRIMARY KEY (metrique, essai_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cmj_valeurs_essai ON cmj_valeurs (essai_id);
+CREATE TABLE IF NOT EXISTS cmj_joueurs_stats (
+    joueur TEXT NOT NULL,
+    metrique TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    somme REAL NOT NULL,
+    somme_carres REAL NOT NULL,
+    vmin REAL,
+    vmax REAL,
+    PRIMARY KEY (joueur, metrique)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cmj_stats (
+    metrique TEXT PRIMARY KEY,
+    n INTEGER,
+    moyenne REAL,
+    variance REAL,
+    min REAL,
+    max REAL,
+    joueur_min TEXT,
+    joueur_max TEXT
+);
+"""
+
+_UPSERT_PLAYER_STATS = """
+INSERT INTO cmj_joueurs_stats (joueur, metrique, n, somme, somme_carres, vmin, vmax)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (joueur, metrique) DO UPDATE SET
+    n = n + excluded.n,
+    somme = somme + excluded.somme,
+    somme_carres = somme_carres + excluded.somme_carres,
+    vmin = MIN(vmin, excluded.vmin),
+    vmax = MAX(vmax, excluded.vmax)
+"""
+
+# Agrégats d'un joueur recalculés depuis ses essais (après correction d'un essai existant)
+_RECOMPUTE_PLAYER_STATS = """
+INSERT INTO cmj_joueurs_stats (joueur, metrique, n, somme, somme_carres, vmin, vmax)
+SELECT e.joueur, v.metrique, COUNT(*), SUM(v.valeur), SUM(v.valeur * v.valeur), MIN(v.valeur), MAX(v.valeur)
+FROM cmj_valeurs v JOIN cmj_essais e ON e.id = v.essai_id
+WHERE e.joueur = ?
+GROUP BY e.joueur, v.metrique
+"""
+
+# Statistiques de groupe déduites des agrégats par joueur (pas de relecture des essais)
+_REFRESH_STATS = """
+DELETE FROM cmj_stats;
+INSERT INTO cmj_stats (metrique, n, moyenne, variance, min, max)
+SELECT metrique, SUM(n), SUM(somme) / SUM(n),
+       CASE WHEN SUM(n) > 1
+            THEN (SUM(somme_carres) - SUM(somme) * SUM(somme) / SUM(n)) / (SUM(n) - 1) END,
+       MIN(vmin), MAX(vmax)
+FROM cmj_joueurs_stats GROUP BY metrique;
+UPDATE cmj_stats SET
+    joueur_max = (SELECT joueur FROM cmj_joueurs_stats j WHERE j.metrique = cmj_stats.metrique
+                  ORDER BY vmax DESC, joueur LIMIT 1),
+    joueur_min = (SELECT joueur FROM cmj_joueurs_stats j WHERE j.metrique = cmj_stats.metrique
+                  ORDER BY vmin ASC, joueur LIMIT 1);
+"""
+
+
+# Taille des blocs lus (en lignes) : la mémoire reste bornée quelle que soit la taille du fichier
+CHUNK_ROWS = 5000
+
+
+def _find_column(columns, candidates):
+    lowered = {str(c).strip().lower(): c for c in columns}
+    return next((lowered[c] for c in candidates if c in lowered), None)
+
+def _open_binary(source):
+    """Flux binaire positionné au début, et s'il faut le fermer après lecture."""
+    if isinstance(source, (str, os.PathLike)): return open(source, "rb"), True
+    source.seek(0)
+    return source, False
+
+def _stream_hash(stream):
+    h = hashlib.sha256()
+    for block in iter(lambda: stream.read(1 << 20), b""): h.update(block)
+    stream.seek(0)
+    return h.hexdigest()
+
+def _sniff_encoding(stream):
+    block = stream.read(1 << 16)
+    stream.seek(0)
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(block, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+def read_cmj_header(stream):
+    """
+    Lit uniquement la ligne d'en-tête de l'export (séparateur ;).
+    Retourne (colonnes, encodage) ; lève ValueError si la colonne 'Joueur' manque.
+    """
+    encoding = _sniff_encoding(stream)
+    header = list(pd.read_csv(stream, sep=";", nrows=0, encoding=encoding).columns)
+    stream.seek(0)
+    if 'Joueur' not in [str(c).strip() for c in header]:
+        raise ValueError(f"La colonne 'Joueur' est introuvable. Colonnes dispos : {[str(c).strip() for c in header]}")
+    return header, encoding
+
+def iter_cmj_chunks(stream, metrics=None, chunksize=CHUNK_ROWS):
+    """
+    Lit l'export par blocs de chunksize lignes, en ne gardant que Joueur, la date,
+    le n° d'essai et les métriques demandées (toutes si metrics est None).
+    Chaque bloc est un DataFrame typé : Joueur, date (texte ISO ou None), essai, métriques float.
+    L'en-tête est validé dès l'appel, avant la lecture des données.
+    """
+    header, encoding = read_cmj_header(stream)
+    by_name = {str(c).strip(): c for c in header}
+    col_player = by_name['Joueur']
+    col_date = _find_column(header, DATE_COLUMNS)
+    col_trial = _find_column(header, TRIAL_COLUMNS)
+    id_cols = [c for c in (col_player, col_date, col_trial) if c is not None]
+    if metrics is None:
+        metric_cols = [c for c in header if c not in id_cols]
+    else:
+        wanted = set(metrics)
+        metric_cols = [c for c in header if str(c).strip() in wanted and c not in id_cols]
+
+    # Tout est lu en texte puis converti bloc par bloc (clean_numeric_series) : le séparateur
+    # décimal ou une unité peuvent changer en cours de fichier sans faire échouer l'import
+    usecols = id_cols + metric_cols
+    reader = pd.read_csv(stream, sep=";", encoding=encoding, usecols=usecols, dtype=str, chunksize=chunksize)
+    return (_typed_chunk(chunk, col_player, col_date, col_trial, metric_cols) for chunk in reader)
+
+def _typed_chunk(chunk, col_player, col_date, col_trial, metric_cols):
+    chunk = chunk[chunk[col_player].notna()]
+    out = pd.DataFrame({'Joueur': chunk[col_player].astype(str).str.strip()}, index=chunk.index)
+    if col_date is not None:
+        dates = pd.to_datetime(chunk[col_date], dayfirst=True, errors='coerce')
+        out['date'] = dates.dt.strftime("%Y-%m-%d %H:%M:%S").where(dates.notna(), None)
+    else:
+        out['date'] = None
+    out['essai'] = pd.to_numeric(chunk[col_trial], errors='coerce') if col_trial is not None else None
+    for c in metric_cols:
+        out[str(c).strip()] = clean_numeric_series(chunk[c])[0]
+    return out
+
+def _upsert_player_stats(con, new_values):
+    """Ajoute les valeurs (joueur, métrique, valeur) du bloc aux agrégats par joueur."""
+    if not new_values: return
+    vals = pd.DataFrame(new_values, columns=["joueur", "metrique", "valeur"])
+    vals["carre"] = vals["valeur"] ** 2
+    agg = vals.groupby(["joueur", "metrique"]).agg(
+        n=("valeur", "size"), somme=("valeur", "sum"), somme_carres=("carre", "sum"),
+        vmin=("valeur", "min"), vmax=("valeur", "max")
+    ).reset_index()
+    con.executemany(_UPSERT_PLAYER_STATS, [
+        (j, m, int(n), float(s), float(q), float(lo), float(hi))
+        for j, m, n, s, q, lo, hi in agg.itertuples(index=False, name=None)
+    ])
+
+
+class CMJStore:
+    """Accès à la base des essais CMJ (une connexion par opération)."""
+
+    def __init__(self, path=CMJ_DB):
+        self.path = path
+        self._ready = False
+        self._lock = threading.Lock()
+        # Fichiers locaux déjà importés : (chemin, taille, mtime) -> évite de les relire
+        self._seen_files = set()
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=10)
+        if not self._ready:
+            with self._lock:
+                con.execute("PRAGMA journal_mode=WAL")
+                con.executescript(_SCHEMA)
+                self._ready = True
+        return con
+
+    def _query(self, sql, params=()):
+        con = self._connect()
+        try:
+            return con.execute(sql, params).fetchall()
+        finally:
+            con.close()
+
+    # --- IMPORT ---
+
+    def ingest(self, source, name=None, metrics=None):
+        """
+        Importe un export CSV (chemin ou fichier uploadé) bloc par bloc.
+        metrics : colonnes à conserver (toutes si None).
+        Un essai daté et numéroté déjà présent (même joueur, date et n° d'essai) est remplacé
+        si ses valeurs ont changé (réexport corrigé).
+        Retourne (nb_essais_ajoutés, nb_essais_corrigés, nb_doublons) ; (0, 0, 0) si le fichier
+        a déjà été importé.
+        """
+        stat_key = None
+        if isinstance(source, (str, os.PathLike)):
+            st_res = os.stat(source)
+            stat_key = (os.path.abspath(source), st_res.st_size, st_res.st_mtime_ns)
+            if stat_key in self._seen_files: return 0, 0, 0
+
+        stream, owned = _open_binary(source)
+        try:
+            file_hash = _stream_hash(stream)
+            if self._query("SELECT 1 FROM cmj_imports WHERE empreinte = ?", (file_hash,)):
+                if stat_key: self._seen_files.add(stat_key)
+                return 0, 0, 0
+            # En-tête validé avant toute lecture des données (ValueError sinon)
+            chunks = iter_cmj_chunks(stream, metrics)
+            name = name or getattr(source, "name", None) or os.path.basename(str(source))
+            counts = self._insert_chunks(chunks, file_hash, name)
+        finally:
+            if owned: stream.close()
+
+        if stat_key: self._seen_files.add(stat_key)
+        return counts
+
+    def _insert_chunks(self, chunks, file_hash, name):
+        con = self._connect()
+        try:
+            with con:
+                import_id = con.execute(
+                    "INSERT INTO cmj_imports (empreinte, nom, importe_le) VALUES (?, ?, ?)",
+                    (file_hash, name, datetime.datetime.now().isoformat(timespec="seconds"))
+                ).lastrowid
+                added = updated = duplicates = 0
+                corrected = set()  # joueurs dont un essai existant a été remplacé
+                trial_counter = {}  # (joueur, date) -> nb d'essais vus (sans colonne n° d'essai)
+                for trials in chunks:
+                    metrics = [c for c in trials.columns if c not in ('Joueur', 'date', 'essai')]
+                    new_values = []
+                    for rec in trials.to_dict("records"):
+                        values = [(m, float(rec[m])) for m in metrics if pd.notna(rec[m])]
+                        seen = trial_counter.get((rec['Joueur'], rec['date']), 0) + 1
+                        trial_counter[(rec['Joueur'], rec['date'])] = seen
+                        keyed = rec['date'] is not None and pd.notna(rec['essai'])
+                        essai = int(rec['essai']) if pd.notna(rec['essai']) else seen
+
+                        if keyed:
+                            # Essai identifié par (joueur, date, n° d'essai) : remplacé si ses valeurs ont changé
+                            existing = con.execute(
+                                "SELECT id FROM cmj_essais WHERE joueur = ? AND date = ? AND essai = ?",
+                                (rec['Joueur'], rec['date'], essai)).fetchone()
+                            if existing:
+                                essai_id = existing[0]
+                                old = dict(con.execute(
+                                    "SELECT metrique, valeur FROM cmj_valeurs WHERE essai_id = ?", (essai_id,)))
+                                if old == dict(values):
+                                    duplicates += 1
+                                    continue
+                                con.execute("DELETE FROM cmj_valeurs WHERE essai_id = ?", (essai_id,))
+                                con.execute("UPDATE cmj_essais SET import_id = ? WHERE id = ?", (import_id, essai_id))
+                                con.executemany("INSERT INTO cmj_valeurs (metrique, essai_id, valeur) VALUES (?, ?, ?)",
+                                                [(m, essai_id, v) for m, v in values])
+                                corrected.add(rec['Joueur'])
+                                updated += 1
+                                continue
+                            raw = "|".join([rec['Joueur'], str(rec['date']), str(essai)])
+                        else:
+                            # Export sans date ou sans n° d'essai : empreinte joueur + date + valeurs mesurées
+                            raw = "|".join([rec['Joueur'], str(rec['date'])] + [f"{m}={v!r}" for m, v in values])
+                        trial_hash = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+                        cur = con.execute(
+                            "INSERT OR IGNORE INTO cmj_essais (joueur, date, essai, empreinte, import_id) VALUES (?, ?, ?, ?, ?)",
+                            (rec['Joueur'], rec['date'], essai, trial_hash, import_id)
+                        )
+                        if cur.rowcount == 0:
+                            duplicates += 1
+                            continue
+                        con.executemany("INSERT INTO cmj_valeurs (metrique, essai_id, valeur) VALUES (?, ?, ?)",
+                                        [(m, cur.lastrowid, v) for m, v in values])
+                        new_values += [(rec['Joueur'], m, v) for m, v in values]
+                        added += 1
+                    # Agrégats par joueur mis à jour bloc par bloc
+                    _upsert_player_stats(con, new_values)
+                # Essais corrigés : agrégats du joueur recalculés depuis ses essais
+                for player in corrected:
+                    con.execute("DELETE FROM cmj_joueurs_stats WHERE joueur = ?", (player,))
+                    con.execute(_RECOMPUTE_PLAYER_STATS, (player,))
+                con.execute("UPDATE cmj_imports SET nb_essais = ? WHERE id = ?", (added + updated, import_id))
+                if added or updated:
+                    for statement in _REFRESH_STATS.split(";"):
+                        if statement.strip(): con.execute(statement)
+            return added, updated, duplicates
+        finally:
+            con.close()
+
+    # --- LECTURE ---
+
+    def data_version(self):
+        """Identifiant du contenu de la base (change à chaque import ajoutant des essais)."""
+        return tuple(self._query("SELECT COALESCE(MAX(import_id), 0), COUNT(*) FROM cmj_essais")[0])
+
+    def is_empty(self):
+        return not self._query("SELECT 1 FROM cmj_essais LIMIT 1")
+
+    def players(self):
+        return [r[0] for r in self._query("SELECT DISTINCT joueur FROM cmj_essais ORDER BY joueur")]
+
+    def metrics(self):
+        return [r[0] for r in self._query("SELECT metrique FROM cmj_stats ORDER BY metrique")]
+
+    def trial_history(self):
+        """Historique couvert par la base : (nb d'imports ayant ajouté des essais, premier test, dernier test)."""
+        return tuple(self._query(
+            "SELECT (SELECT COUNT(*) FROM cmj_imports WHERE nb_essais > 0), MIN(date), MAX(date) FROM cmj_essais")[0])
+
+    def group_stats(self, metrics=None):
+        """
+        Statistiques de groupe pré-calculées (tous les essais de tous les imports) :
+        {métrique: {n, mean, std, min, max, player_min, player_max}}.
+        """
+        rows = self._query("SELECT metrique, n, moyenne, variance, min, max, joueur_min, joueur_max FROM cmj_stats")
+        stats = {}
+        for m, n, mean, var, vmin, vmax, p_min, p_max in rows:
+            if metrics is not None and m not in metrics: continue
+            stats[m] = {"n": n, "mean": mean, "std": max(var, 0) ** 0.5 if var is not None else float("nan"),
+                        "min": vmin, "max": vmax, "player_min": p_min, "player_max": p_max}
+        return stats
+
+    def player_stats(self, player):
+        """Agrégats de tous les essais du joueur : {métrique: {n, mean, min, max}}."""
+        rows = self._query("SELECT metrique, n, somme, vmin, vmax FROM cmj_joueurs_stats WHERE joueur = ?", (player,))
+        return {m: {"n": n, "mean": s / n, "min": lo, "max": hi} for m, n, s, lo, hi in rows}
+
+    def latest_trial(self, player):
+        """
+        Valeurs du dernier essai du joueur : {métrique: valeur} (vide si aucun essai).
+        Date la plus récente (essais non datés en dernier), puis n° d'essai, puis import le plus récent.
+        """
+        rows = self._query(
+            "SELECT v.metrique, v.valeur FROM cmj_valeurs v WHERE v.essai_id = ("
+            "  SELECT id FROM cmj_essais WHERE joueur = ? ORDER BY date DESC, essai DESC, import_id DESC, id DESC LIMIT 1)",
+            (player,))
+        return dict(rows)
+
+    def player_trials(self, player, metric):
+        """Historique d'une métrique pour un joueur : DataFrame (date, essai, valeur)."""
+        rows = self._query(
+            "SELECT e.date, e.essai, v.valeur FROM cmj_essais e JOIN cmj_valeurs v ON v.essai_id = e.id "
+            "WHERE e.joueur = ? AND v.metrique = ? ORDER BY e.date, e.essai, e.id",
+            (player, metric))
+        return pd.DataFrame(rows, columns=["date", "essai", "valeur"])
+
+    def trials_frame(self):
+        """Tous les essais au format large (une ligne par essai), comme le CSV d'origine."""
+        rows = self._query(
+            "SELECT e.id, e.joueur, e.date, e.essai, v.metrique, v.valeur "
+            "FROM cmj_essais e JOIN cmj_valeurs v ON v.essai_id = e.id")
+        if not rows: return pd.DataFrame(columns=['Joueur'])
+        long = pd.DataFrame(rows, columns=["id", "Joueur", "date", "essai", "metrique", "valeur"])
+        long[["date", "essai"]] = long[["date", "essai"]].fillna("")
+        wide = long.pivot_table(index=["id", "Joueur", "date", "essai"], columns="metrique",
+                                values="valeur", aggfunc="first", dropna=False)
+        return wide.reset_index().drop(columns="id")
+
+
+_STORE = None
+
+def get_cmj_store():
+    global _STORE
+    if _STORE is None or _STORE.path != CMJ_DB:
+        _STORE = CMJStore(CMJ_DB)
+    return _STORE
@@ -0,0 +1,95 @@
+import unicodedata
+from functools import lru_cache
+
+from config_rapport import COL_MAPPING, KEYWORD_MAPPING
+
+# =============================================================================
+# RÉSOLUTION DES COLONNES (LIBELLÉ UI -> COLONNE EXCEL)
+# =============================================================================
+
+def normalize_label(input_str):
+    """Supprime les accents, passe en minuscules et retire les espaces superflus."""
+    if not isinstance(input_str, str): input_str = str(input_str)
+    nfkd_form = unicodedata.normalize('NFKD', input_str)
+    return "".join([c for c in nfkd_form if not unicodedata.combining(c)]).lower().strip()
+
+
+class ColumnResolver:
+    """
+    Index de résolution construit une seule fois par schéma (tuple des colonnes).
+    Ordre de recherche, identique pour toutes les pages :
+      1. COL_MAPPING (libellé -> en-tête exact, insensible à la casse)
+      2. Le libellé est lui-même un en-tête du fichier
+      3. Mots-clés de KEYWORD_MAPPING contenus dans un en-tête
+      4. Libellé normalisé contenu dans un en-tête
+    Les libellés des deux mappings sont résolus dès la construction ;
+    les autres sont mémorisés au premier appel.
+    """
+
+    def __init__(self, columns, col_mapping=COL_MAPPING, keyword_mapping=KEYWORD_MAPPING):
+        self.columns = list(columns)
+        self._column_set = set(self.columns)
+        self._normalized = [normalize_label(c) for c in self.columns]
+        self._col_mapping_lower = {k.lower(): v for k, v in col_mapping.items()}
+        self._keywords = {
+            label: [normalize_label(k) for k in keywords]
+            for label, keywords in keyword_mapping.items()
+        }
+        self._resolved = {}
+        for label in list(col_mapping.keys()) + list(keyword_mapping.keys()):
+            self._resolved[label] = self._resolve(label)
+
+    def _first_containing(self, needle):
+        for idx, col_name in enumerate(self._normalized):
+            if needle in col_name: return self.columns[idx]
+        return None
+
+    def _resolve(self, label):
+        # 1. Mapping direct
+        mapped = self._col_mapping_lower.get(str(label).lower())
+        if mapped in self._column_set: return mapped
+
+        # 2. En-tête exact
+        if label in self._column_set: return label
+
+        # 3. Mots-clés
+        for k in self._keywords.get(label, []):
+            found = self._first_containing(k)
+            if found is not None: return found
+
+        # 4. Libellé approché
+        label_clean = normalize_label(label)
+        if label_clean: return self._first_containing(label_clean)
+        return None
+
+    def find(self, label):
+        """Retourne le nom de colonne correspondant au libellé, ou None."""
+        try:
+            return self._resolved[label]
+        except KeyError:
+            found = self._resolve(label)
+            self._resolved[label] = found
+            return found
+
+    def number_column(self):
+        """Colonne du numéro de maillot (au cas où l'en-tête change)."""
+        if "__numero__" not in self._resolved:
+            cols_map = {n: c for n, c in zip(self._normalized, self.columns)}
+            found = None
+            for t in ['numero', 'number', 'maillot', 'shirt', 'n°']:
+                if t in cols_map:
+                    found = cols_map[t]
+                    break
+            if found is None:
+                found = next((c for n, c in cols_map.items() if n.startswith("num") or n == "n°"), None)
+            self._resolved["__numero__"] = found
+        return self._resolved["__numero__"]
+
+
+@lru_cache(maxsize=16)
+def _resolver_for_columns(columns):
+    return ColumnResolver(columns)
+
+def get_column_resolver(df):
+    """Retourne le résolveur (partagé) associé au schéma du DataFrame."""
+    return _resolver_for_columns(tuple(df.columns))
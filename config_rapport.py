@@ -28,11 +28,52 @@ COL_MAPPING = {
     "Squat Keiser": "Keiser squat R=100", "Tirage Dos Keiser": "Tirage dos Keiser", "Développé couché (W)": "Developpé couché (W)",
     "Développé couché (W/kg)": "Developpé couché (W/kg)", "Landmine Throw": "Landmine throw",
     "VMA": "VMA", "Temps 10m (Terrain)": "Temps 10m", "5-0-5": "5 - 0 - 5",
-    "Distance Totale": "Distance totale", "Distance HSR": "Distance HSR",
+    "Distance Totale": "Distance totale", "Distance HSR": "Distance HSR", "Distance Sprint (92% Vmax)": "Distance Sprint (92% Vmax)",
     "Nb Accélérations": "Nb Acc", "Nb Décélérations": "Nb Dec",
     "Vmax": "Vmax", "Amax": "Amax", "Dmax": "Dmax"
 }
 
+# Mots-clés de secours pour retrouver une colonne quand l'en-tête exact diffère
+KEYWORD_MAPPING = {
+    "Taille": ["taille", "height"], "Poids": ["poids", "weight"],
+    "Masse Grasse Plis (mm)": ["masse grasse", "fat", "img"],
+    "Numéro": ["numero", "numéro", "number", "maillot"],
+    "Poste": ["poste", "position"], "Latéralité": ["latéralité", "laterality", "pied"],
+    "Knee To Wall (G)": ["knee to wall - gauche", "ktw g"], "Knee To Wall (D)": ["knee to wall - droite", "ktw d"],
+    "Sit And Reach": ["sit and reach", "souplesse"],
+    "Adducteurs (G)": ["adducteurs - gauche", "add g"], "Adducteurs (D)": ["adducteurs - droite", "add d"],
+    "Abducteurs (G)": ["abducteurs - gauche", "abd g"], "Abducteurs (D)": ["abducteurs - droite", "abd d"],
+    "Nordic Ischio (G)": ["nordic ischio - gauche", "nordic g"], "Nordic Ischio (D)": ["nordic ischio - droite", "nordic d"],
+    "Landing (G)": ["landing g"], "Landing (D)": ["landing dt", "landing d"],
+    "Landing %": ["landing %", "landing", "asymétrie landing"],
+    "Q Conc 60° (G)": ["q g conc 60"], "Q Conc 60° (D)": ["q dt conc 60"],
+    "Q Conc 240° (G)": ["q g conc 240"], "Q Conc 240° (D)": ["q dt conc 240"],
+    "IJ Conc 60° (G)": ["ij g conc 60"], "IJ Conc 60° (D)": ["ij dt conc 60"],
+    "IJ Conc 240° (G)": ["ij g conc 240"], "IJ Conc 240° (D)": ["ij dt conc 240"],
+    "IJ Exc 30° (G)": ["ij g exc 30"], "IJ Exc 30° (D)": ["ij dt exc 30"],
+    "Q Exc 30° (G)": ["q g exc 30", "quad g exc 30"], 
+    "Q Exc 30° (D)": ["q dt exc 30", "quad dt exc 30"],
+    "Ratio Mixte (G)": ["ratio mixte g", "mixte g"], 
+    "Ratio Mixte (D)": ["ratio mixte dt", "mixte d", "mixte dt", "ratio mixte d"],
+    "Score Sommeil": ["score sommeil", "sommeil"], "Score Nutrition": ["score nutrition", "nutrition"],
+    "CMJ (cm)": ["cmj", "saut"], "Wattbike 6s (W)": ["wattbike"],
+    "Squat Keiser": ["keiser squat", "squat r=100"], "Tirage Dos Keiser": ["tirage dos"],
+    
+    
+    "Développé couché (W)" : ["developpé couché (W)", "couché (W)"], 
+    "Développé couché (W/kg)" : ["developpé couché (W/kg)", "couché (W/kg)"],
+    
+    "Landmine Throw": ["landmine"],
+    "10m 1080 (s)": ["10m 1080", "1080"],
+    "VMA": ["vma"], "SV1": ["sv1"], "SV2": ["sv2"],
+    "Temps 10m (Terrain)": ["temps 10m", "chrono 10m"], "5-0-5": ["5 - 0 - 5", "505"],
+    "Distance Totale": ["distance totale", "total dist"], "Distance HSR": ["distance hsr", "hsr"],
+    "Distance Sprint (92% Vmax)" : ["distance sprint", "sprint"],
+    "Nb Accélérations": ["nb acc"], "Nb Décélérations": ["nb dec"],
+    "Vmax": ["vmax"], "Amax": ["amax"], "Dmax": ["dmax"],
+    "Score Sommeil": ["score sommeil", "sommeil"], "Score Nutrition": ["score nutrition", "nutrition"],
+}
+
 OFFICIAL_STRUCTURE = {
     "PROFILAGE MOTEUR": [
         "Somme ADD", "Ratio Squeeze", "Somme ABD", 
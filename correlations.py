@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from column_resolver import get_column_resolver
+from data_cache import dataset_key
+from lru import LRUCache
+from player_dataset import get_player_dataset
+
+# =============================================================================
+# MATRICE DE CORRÉLATION DES INDICATEURS
+# =============================================================================
+# Pearson et Spearman sur toutes les métriques résolues, avec le nombre de joueurs
+# ayant les deux valeurs (paires complètes). Calculée une fois par jeu de données
+# et par sélection de postes, à partir de la même vue numérique que les graphiques.
+
+# Nombre minimum de joueurs communs pour afficher un coefficient
+MIN_PERIODS = 5
+
+METHODS = {"pearson": "Pearson", "spearman": "Spearman"}
+
+
+class CorrelationMatrix:
+    """Coefficients (Pearson, Spearman) et effectifs par paire, indexés par libellé."""
+
+    def __init__(self, values):
+        self.labels = list(values.columns)
+        present = values.notna().astype(np.int64)
+        self.counts = present.T.dot(present)
+        self.pearson = values.corr(method="pearson", min_periods=MIN_PERIODS)
+        self.spearman = values.corr(method="spearman", min_periods=MIN_PERIODS)
+
+    def matrix(self, method="pearson"):
+        return self.spearman if method == "spearman" else self.pearson
+
+    def pair(self, label_x, label_y):
+        """(r Pearson, rho Spearman, n) pour deux libellés ; coefficients None si n insuffisant."""
+        r_p = self.pearson.at[label_x, label_y]
+        r_s = self.spearman.at[label_x, label_y]
+        return (None if pd.isna(r_p) else float(r_p),
+                None if pd.isna(r_s) else float(r_s),
+                int(self.counts.at[label_x, label_y]))
+
+    def strongest_pairs(self, method="pearson", top=10):
+        """Paires les plus corrélées (en valeur absolue) : DataFrame (X, Y, r, n)."""
+        m = self.matrix(method)
+        upper = np.triu(np.ones(m.shape, dtype=bool), k=1)
+        pairs = m.where(upper).stack()
+        pairs = pairs.reindex(pairs.abs().sort_values(ascending=False).index)[:top]
+        return pd.DataFrame({
+            "X": pairs.index.get_level_values(0),
+            "Y": pairs.index.get_level_values(1),
+            "r": pairs.round(2).to_numpy(),
+            "n": [int(self.counts.at[a, b]) for a, b in pairs.index],
+        })
+
+
+def resolve_metrics(df, labels):
+    """{libellé: colonne} des libellés présents dans df (ordre conservé, sans doublon)."""
+    resolver = get_column_resolver(df)
+    found = {}
+    for label in dict.fromkeys(labels):
+        col = resolver.find(label)
+        if col: found[label] = col
+    return found
+
+
+_MATRICES = LRUCache(max_items=8)
+
+def _build_matrix(df, labels, postes):
+    view = get_player_dataset(df).position_view(postes)
+    values = pd.DataFrame({label: view[col] for label, col in resolve_metrics(df, labels).items()},
+                          index=view.index)
+    return CorrelationMatrix(values)
+
+def get_correlation_matrix(df, labels, postes=None):
+    """CorrelationMatrix des libellés sur les joueurs des postes demandés (tous si vide)."""
+    key = dataset_key(df, tuple(labels), frozenset(postes) if postes else None)
+    return _MATRICES.get_or_create(key, lambda: _build_matrix(df, labels, postes))
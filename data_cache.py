@@ -0,0 +1,210 @@
+import os
+import io
+import hashlib
+from functools import wraps
+
+import pandas as pd
+
+from lru import LRUCache
+
+# =============================================================================
+# 1. CONFIGURATION DU CACHE
+# =============================================================================
+
+# Dossier local du cache colonnaire (ignoré par git)
+CACHE_DIR = os.path.join(".cache", "donnees")
+
+# Version du format de nettoyage : à incrémenter si la préparation change
+CACHE_FORMAT = 1
+
+# Noms acceptés pour la colonne joueur (par ordre de priorité)
+PLAYER_COLUMN_CANDIDATES = ['joueur', 'nom', 'name']
+
+# Empreintes déjà calculées : (chemin, taille, mtime) -> hash du contenu
+_DIGEST_MEMO = {}
+
+# Derniers DataFrames relus : nom du fichier cache -> DataFrame
+_FRAME_MEMO = LRUCache(max_items=4)
+
+
+def _parquet_available():
+    """Indique si un moteur Parquet (pyarrow) est installé."""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+# =============================================================================
+# 2. EMPREINTE DE LA SOURCE
+# =============================================================================
+
+def _hash_bytes(content):
+    return hashlib.sha256(content).hexdigest()
+
+def _source_fingerprint(source):
+    """
+    Calcule l'identité d'une source Excel.
+    Retourne : (clé_de_chemin, empreinte, contenu_ou_None)
+    - chemin local : clé = chemin absolu, empreinte = taille + mtime + hash du contenu
+    - fichier uploadé : clé = nom du fichier, empreinte = taille + hash du contenu
+    """
+    if isinstance(source, (str, os.PathLike)):
+        path = os.path.abspath(os.fspath(source))
+        st_res = os.stat(path)
+        stat_key = (path, st_res.st_size, st_res.st_mtime_ns)
+        digest = _DIGEST_MEMO.get(stat_key)
+        if digest is None:
+            with open(path, "rb") as f:
+                digest = _hash_bytes(f.read())
+            _DIGEST_MEMO[stat_key] = digest
+        return path, f"{st_res.st_size}-{st_res.st_mtime_ns}-{digest}", None
+
+    # Objet fichier (st.file_uploader ou BytesIO)
+    if hasattr(source, "getvalue"):
+        content = source.getvalue()
+    else:
+        content = source.read()
+    name = getattr(source, "name", "upload")
+    return f"upload:{name}", f"{len(content)}-{_hash_bytes(content)}", content
+
+def _cache_path(path_key, fingerprint, strip_columns):
+    path_id = hashlib.sha1(path_key.encode("utf-8")).hexdigest()[:12]
+    variant = f"{fingerprint}-strip{int(strip_columns)}-v{CACHE_FORMAT}"
+    content_id = hashlib.sha1(variant.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{path_id}_{content_id}.parquet"), path_id, content_id
+
+# =============================================================================
+# 3. NETTOYAGE
+# =============================================================================
+
+def prepare_profiling_frame(df, strip_columns=True):
+    """
+    Nettoie un DataFrame brut de profilage : colonnes (optionnellement strippées),
+    colonne joueur renommée en 'Joueur' et normalisée.
+    Retourne None si la colonne joueur est introuvable.
+    """
+    if strip_columns:
+        df.columns = [str(c).strip() for c in df.columns]
+    else:
+        df.columns = [str(c) for c in df.columns]
+
+    cols_lower = {str(c).lower().strip(): c for c in df.columns}
+    target = next((cols_lower[k] for k in PLAYER_COLUMN_CANDIDATES if k in cols_lower), None)
+    if not target: return None
+
+    df = df.dropna(subset=[target]).rename(columns={target: 'Joueur'})
+    df['Joueur'] = df['Joueur'].astype(str).str.title().str.strip()
+    return _arrow_safe(df)
+
+def _arrow_safe(df):
+    """
+    Les colonnes Excel mélangent parfois nombres et textes ("12,5", "-").
+    On convertit ces colonnes mixtes en texte pour qu'elles soient sérialisables en Parquet
+    (les fonctions de nettoyage numérique gèrent déjà les chaînes).
+    """
+    for c in df.columns:
+        if df[c].dtype == object:
+            types = {type(v) for v in df[c].dropna()}
+            if len(types) > 1:
+                df[c] = df[c].map(lambda v: v if pd.isna(v) else str(v))
+    return df
+
+# =============================================================================
+# 4. LECTURE AVEC CACHE
+# =============================================================================
+
+def _remember(cache_file, df):
+    _FRAME_MEMO.put(cache_file, df)
+
+def _write_parquet(df, cache_file, path_id):
+    """Écrit le cache de façon atomique et supprime les anciennes versions du même fichier."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = cache_file + ".tmp"
+        df.to_parquet(tmp, index=True)
+        os.replace(tmp, cache_file)
+        for f in os.listdir(CACHE_DIR):
+            full = os.path.join(CACHE_DIR, f)
+            if f.startswith(f"{path_id}_") and full != cache_file:
+                os.remove(full)
+    except Exception:
+        # Le cache est une optimisation : un échec d'écriture ne doit jamais bloquer le chargement
+        pass
+
+def load_profiling_workbook(source, strip_columns=True):
+    """
+    Charge un classeur de profilage (chemin local ou fichier uploadé).
+    Lit la version Parquet nettoyée si le classeur n'a pas changé,
+    sinon repasse par openpyxl et met le cache à jour.
+    Retourne le DataFrame nettoyé, ou None si la colonne joueur est introuvable.
+    """
+    path_key, fingerprint, content = _source_fingerprint(source)
+    cache_file, path_id, content_id = _cache_path(path_key, fingerprint, strip_columns)
+
+    # 1. Mémoire du processus
+    df = _FRAME_MEMO.get(cache_file)
+    if df is not None:
+        return df
+
+    # 2. Cache disque
+    use_parquet = _parquet_available()
+    if use_parquet and os.path.exists(cache_file):
+        try:
+            df = pd.read_parquet(cache_file)
+            df.attrs['dataset_version'] = content_id
+            df.attrs['dataset_rows'] = len(df)
+            _remember(cache_file, df)
+            return df
+        except Exception:
+            pass
+
+    # 3. Lecture Excel (lente)
+    raw = io.BytesIO(content) if content is not None else path_key
+    df = pd.read_excel(raw, header=0)
+    df = prepare_profiling_frame(df, strip_columns=strip_columns)
+    if df is None: return None
+
+    df.attrs['dataset_version'] = content_id
+    df.attrs['dataset_rows'] = len(df)
+    if use_parquet: _write_parquet(df, cache_file, path_id)
+    _remember(cache_file, df)
+    return df
+
+def dataset_version(df):
+    """
+    Identifiant stable d'un jeu de données, utilisé comme clé par les caches dérivés.
+    Utilise l'empreinte posée au chargement, sinon un hash du contenu.
+    Les attrs pandas étant recopiés sur les sous-ensembles (filtres), l'empreinte
+    n'est réutilisée que si le nombre de lignes correspond.
+    """
+    version = df.attrs.get('dataset_version')
+    if version is None or df.attrs.get('dataset_rows') != len(df):
+        version = str(pd.util.hash_pandas_object(df, index=True).sum())
+        df.attrs['dataset_version'] = version
+        df.attrs['dataset_rows'] = len(df)
+    return version
+
+# =============================================================================
+# 5. CACHES DÉRIVÉS PAR JEU DE DONNÉES
+# =============================================================================
+
+def dataset_key(df, *extra):
+    """Clé des caches dérivés : (version, colonnes) du jeu de données, plus d'éventuels paramètres."""
+    return (dataset_version(df), tuple(df.columns)) + extra
+
+def cached_per_dataset(max_items=8):
+    """
+    Décorateur : func(df) n'est calculée qu'une fois par jeu de données (clé dataset_key),
+    les max_items derniers résultats étant gardés (LRU, exposée par wrapper.cache).
+    Les résultats sont partagés : ils ne doivent pas être modifiés.
+    """
+    def decorator(func):
+        cache = LRUCache(max_items)
+
+        @wraps(func)
+        def wrapper(df):
+            return cache.get_or_create(dataset_key(df), lambda: func(df))
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -0,0 +1,71 @@
+# =============================================================================
+# DIFFÉRENCES ENTRE DEUX VERSIONS DU FICHIER DE PROFILAGE
+# =============================================================================
+
+PLAYER_KEY = 'Joueur'
+
+
+class DatasetDiff:
+    """
+    Résultat de la comparaison ligne à ligne (clé = Joueur) de deux jeux de données.
+    - added / removed / changed : noms des joueurs concernés
+    - changed_columns : colonnes dont au moins une valeur a changé (ajouts/suppressions compris)
+    - full : True si la comparaison n'est pas possible (schéma différent, doublons...)
+    """
+
+    def __init__(self, added=(), removed=(), changed=(), changed_columns=(), full=False):
+        self.added = sorted(added)
+        self.removed = sorted(removed)
+        self.changed = sorted(changed)
+        self.changed_columns = set(changed_columns)
+        self.full = full
+
+    @property
+    def players(self):
+        return sorted(set(self.added) | set(self.removed) | set(self.changed))
+
+    @property
+    def has_changes(self):
+        return self.full or bool(self.added or self.removed or self.changed)
+
+    def summary(self):
+        """Message court pour l'interface."""
+        if self.full: return "Structure du fichier modifiée : toutes les statistiques ont été recalculées."
+        if not self.has_changes: return "Aucun changement par rapport aux données précédentes."
+        parts = []
+        if self.changed: parts.append(f"{len(self.changed)} modifié(s) : {', '.join(self.changed)}")
+        if self.added: parts.append(f"{len(self.added)} ajouté(s) : {', '.join(self.added)}")
+        if self.removed: parts.append(f"{len(self.removed)} retiré(s) : {', '.join(self.removed)}")
+        return "Joueurs " + " | ".join(parts)
+
+
+def diff_datasets(old_df, new_df, key=PLAYER_KEY):
+    """Compare deux DataFrames de profilage joueur par joueur."""
+    if old_df is None or new_df is None or key not in old_df.columns or key not in new_df.columns:
+        return DatasetDiff(full=True)
+    if list(old_df.columns) != list(new_df.columns):
+        return DatasetDiff(full=True)
+    if old_df[key].duplicated().any() or new_df[key].duplicated().any():
+        return DatasetDiff(full=True)
+
+    old = old_df.set_index(key)
+    new = new_df.set_index(key)
+    added = new.index.difference(old.index)
+    removed = old.index.difference(new.index)
+    common = new.index.intersection(old.index)
+
+    # Valeurs égales, ou manquantes des deux côtés
+    a = old.loc[common].astype(object)
+    b = new.loc[common].astype(object)
+    diff_mask = ~((a == b) | (a.isna() & b.isna()))
+
+    changed = common[diff_mask.any(axis=1).to_numpy()]
+    changed_columns = set(diff_mask.columns[diff_mask.any(axis=0).to_numpy()])
+    # Un joueur ajouté ou retiré modifie les statistiques des colonnes qu'il renseigne
+    for frame, players in ((new, added), (old, removed)):
+        if len(players):
+            filled = frame.loc[players].notna().any(axis=0)
+            changed_columns |= set(filled.index[filled.to_numpy()])
+
+    return DatasetDiff(added=list(added), removed=list(removed), changed=list(changed),
+                       changed_columns=changed_columns)
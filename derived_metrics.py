@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from config_rapport import COL_MAPPING
+from column_resolver import get_column_resolver
+from data_cache import dataset_version, cached_per_dataset
+from numeric import get_numeric_frame, numeric_row
+
+# =============================================================================
+# MÉTRIQUES DÉRIVÉES (MOYENNES BILATÉRALES G/D)
+# =============================================================================
+# Calculées une fois par jeu de données dans un DataFrame séparé :
+# le DataFrame source (partagé par st.cache_data) n'est jamais modifié.
+
+# Noms historiques utilisés par le radar du rapport
+NAMED_BILATERAL_MEANS = {
+    "Nordic Mean": ("Nordic Ischio (G)", "Nordic Ischio (D)"),
+    "Adducteurs Mean": ("Adducteurs (G)", "Adducteurs (D)"),
+    "Calculated_KTW_Mean": ("Knee To Wall (G)", "Knee To Wall (D)"),
+}
+
+def _all_bilateral_pairs():
+    """Toutes les paires (G)/(D) de COL_MAPPING -> '<Libellé> Mean'."""
+    pairs = dict(NAMED_BILATERAL_MEANS)
+    already = set(NAMED_BILATERAL_MEANS.values())
+    for label in COL_MAPPING:
+        if "(G)" not in label: continue
+        label_d = label.replace("(G)", "(D)")
+        if label_d not in COL_MAPPING or (label, label_d) in already: continue
+        pairs[f"{label.replace('(G)', '').strip()} Mean"] = (label, label_d)
+    return pairs
+
+BILATERAL_MEANS = _all_bilateral_pairs()
+
+
+def compute_derived_metrics(df):
+    """Retourne un DataFrame (même index que df) des moyennes G/D disponibles."""
+    resolver = get_column_resolver(df)
+    values = get_numeric_frame(df).values  # cellules déjà converties (une fois par version)
+    out = {}
+    for name, (label_g, label_d) in BILATERAL_MEANS.items():
+        col_g, col_d = resolver.find(label_g), resolver.find(label_d)
+        if not col_g or not col_d or col_g not in values or col_d not in values: continue
+        out[name] = pd.concat([values[col_g], values[col_d]], axis=1).mean(axis=1)
+
+    derived = pd.DataFrame(out, index=df.index)
+    derived.attrs['dataset_version'] = f"{dataset_version(df)}-derived"
+    derived.attrs['dataset_rows'] = len(derived)
+    return derived
+
+def bilateral_mean_value(df, df_row, name):
+    """Moyenne G/D d'un joueur (ligne df_row de df, côtés manquants ignorés), ou None."""
+    if name not in BILATERAL_MEANS: return None
+    resolver = get_column_resolver(df)
+    row_num = numeric_row(df, df_row)
+    vals = []
+    for label in BILATERAL_MEANS[name]:
+        col = resolver.find(label)
+        v = row_num.get(col) if col else None
+        if v is not None: vals.append(v)
+    return float(np.mean(vals)) if vals else None
+
+# =============================================================================
+# CACHE PAR VERSION
+# =============================================================================
+
+@cached_per_dataset()
+def get_derived_metrics(df):
+    """Métriques dérivées du jeu de données (calculées une fois par version, à ne pas modifier)."""
+    return compute_derived_metrics(df)
@@ -0,0 +1,195 @@
+import os
+import sqlite3
+import datetime
+import threading
+
+import pandas as pd
+
+from config_rapport import OFFICIAL_STRUCTURE, COL_MAPPING
+from column_resolver import get_column_resolver
+from data_cache import dataset_version
+from numeric import get_numeric_frame
+
+# =============================================================================
+# HISTORIQUE MULTI-SAISONS DES TESTS DE PROFILAGE (SQLITE)
+# =============================================================================
+# Une ligne par (joueur, métrique, date) : chaque campagne de tests est ajoutée
+# sans écraser les précédentes. Les métriques sont stockées sous leur libellé
+# officiel (ex : "Nordic Ischio (G)"), quel que soit l'en-tête du fichier.
+
+HISTORY_DB = "historique_profilage.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS campagnes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    source TEXT,
+    version TEXT,
+    importe_le TEXT NOT NULL,
+    UNIQUE (date, version)
+);
+CREATE TABLE IF NOT EXISTS mesures (
+    joueur TEXT NOT NULL,
+    metrique TEXT NOT NULL,
+    date TEXT NOT NULL,
+    valeur REAL NOT NULL,
+    campagne_id INTEGER REFERENCES campagnes(id),
+    PRIMARY KEY (joueur, metrique, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_mesures_metrique_date ON mesures (metrique, date);
+CREATE INDEX IF NOT EXISTS idx_mesures_date ON mesures (date);
+"""
+
+
+def _date_str(date):
+    if date is None: return datetime.date.today().isoformat()
+    if isinstance(date, (datetime.date, datetime.datetime)): return date.strftime("%Y-%m-%d")
+    return pd.Timestamp(date).strftime("%Y-%m-%d")
+
+def history_metrics():
+    """Libellés officiels historisés (structure du rapport + mapping), sans doublon."""
+    labels = [v for variables in OFFICIAL_STRUCTURE.values() for v in variables] + list(COL_MAPPING)
+    return list(dict.fromkeys(labels))
+
+
+class HistoryStore:
+    """Accès à la base d'historique (une connexion par opération : sûr avec les threads Streamlit)."""
+
+    def __init__(self, path=HISTORY_DB):
+        self.path = path
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=10)
+        if not self._ready:
+            with self._lock:
+                con.execute("PRAGMA journal_mode=WAL")
+                con.executescript(_SCHEMA)
+                self._ready = True
+        return con
+
+    # --- ÉCRITURE ---
+
+    def append_dataset(self, df, date=None, source=None, replace=False):
+        """
+        Ajoute la campagne (valeurs numériques de df) à la date donnée.
+        Une mesure déjà présente pour (joueur, métrique, date) n'est écrasée que si replace.
+        Aucune campagne n'est enregistrée si aucune mesure n'est écrite.
+        Retourne (nb de mesures écrites, nb de mesures archivées à cette date avec une autre valeur
+        et laissées intactes).
+        """
+        date = _date_str(date)
+        resolver = get_column_resolver(df)
+        values = get_numeric_frame(df).values
+        players = df['Joueur'].astype(str)
+
+        rows = []
+        for label in history_metrics():
+            col = resolver.find(label)
+            if not col or col not in values.columns: continue
+            col_vals = values[col]
+            mask = col_vals.notna().to_numpy()
+            rows += zip(players[mask], [label] * int(mask.sum()), [date] * int(mask.sum()),
+                        col_vals[mask].astype(float))
+        if not rows: return 0, 0
+
+        con = self._connect()
+        try:
+            with con:
+                # Mesures déjà archivées à cette date : nouvelles, identiques ou différentes
+                archived = {(j, m): v for j, m, v in con.execute(
+                    "SELECT joueur, metrique, valeur FROM mesures WHERE date = ?", (date,))}
+                new_rows = [r for r in rows if (r[0], r[1]) not in archived]
+                changed = [r for r in rows if (r[0], r[1]) in archived and archived[(r[0], r[1])] != r[3]]
+                if not new_rows and not (replace and changed):
+                    return 0, len(changed)
+
+                version = dataset_version(df)
+                cur = con.execute(
+                    "INSERT OR IGNORE INTO campagnes (date, source, version, importe_le) VALUES (?, ?, ?, ?)",
+                    (date, source, version, datetime.datetime.now().isoformat(timespec="seconds"))
+                )
+                campagne_id = cur.lastrowid if cur.rowcount else con.execute(
+                    "SELECT id FROM campagnes WHERE date = ? AND version = ?", (date, version)).fetchone()[0]
+                con.executemany(
+                    "INSERT OR IGNORE INTO mesures (joueur, metrique, date, valeur, campagne_id) VALUES (?, ?, ?, ?, ?)",
+                    [r + (campagne_id,) for r in new_rows]
+                )
+                if not replace: return len(new_rows), len(changed)
+                con.executemany(
+                    "UPDATE mesures SET valeur = ?, campagne_id = ? WHERE joueur = ? AND metrique = ? AND date = ?",
+                    [(v, campagne_id, j, m, d) for j, m, d, v in changed]
+                )
+                return len(new_rows) + len(changed), 0
+        finally:
+            con.close()
+
+    # --- LECTURE ---
+
+    def _query(self, sql, params=()):
+        con = self._connect()
+        try:
+            return con.execute(sql, params).fetchall()
+        finally:
+            con.close()
+
+    def latest(self, player, metric):
+        """Dernière valeur connue : (date, valeur) ou None."""
+        rows = self._query(
+            "SELECT date, valeur FROM mesures WHERE joueur = ? AND metrique = ? ORDER BY date DESC LIMIT 1",
+            (player, metric))
+        return rows[0] if rows else None
+
+    def value_at(self, player, metric, date):
+        """Valeur en vigueur à une date (dernière mesure à cette date ou avant) : (date, valeur) ou None."""
+        rows = self._query(
+            "SELECT date, valeur FROM mesures WHERE joueur = ? AND metrique = ? AND date <= ? "
+            "ORDER BY date DESC LIMIT 1",
+            (player, metric, _date_str(date)))
+        return rows[0] if rows else None
+
+    def history(self, player, metric):
+        """Évolution d'une métrique pour un joueur : DataFrame (date, valeur) trié par date."""
+        rows = self._query(
+            "SELECT date, valeur FROM mesures WHERE joueur = ? AND metrique = ? ORDER BY date",
+            (player, metric))
+        out = pd.DataFrame(rows, columns=["date", "valeur"])
+        out["date"] = pd.to_datetime(out["date"])
+        return out
+
+    def player_metrics(self, player, min_points=1):
+        """Métriques du joueur ayant au moins min_points mesures : {métrique: nb}."""
+        rows = self._query(
+            "SELECT metrique, COUNT(*) FROM mesures WHERE joueur = ? GROUP BY metrique HAVING COUNT(*) >= ?",
+            (player, min_points))
+        return dict(rows)
+
+    def snapshot(self, date=None):
+        """Valeurs en vigueur à une date pour tout l'effectif : DataFrame large (Joueur x métrique)."""
+        rows = self._query(
+            "SELECT m.joueur, m.metrique, m.valeur FROM mesures m "
+            "JOIN (SELECT joueur, metrique, MAX(date) AS d FROM mesures WHERE date <= ? "
+            "      GROUP BY joueur, metrique) t "
+            "ON m.joueur = t.joueur AND m.metrique = t.metrique AND m.date = t.d",
+            (_date_str(date),))
+        if not rows: return pd.DataFrame(columns=["Joueur"])
+        long = pd.DataFrame(rows, columns=["Joueur", "metrique", "valeur"])
+        return long.pivot(index="Joueur", columns="metrique", values="valeur").reset_index()
+
+    def campaigns(self):
+        """Campagnes archivées : DataFrame (date, source, importe_le)."""
+        rows = self._query("SELECT date, source, importe_le FROM campagnes ORDER BY date")
+        return pd.DataFrame(rows, columns=["date", "source", "importe_le"])
+
+
+_STORE = None
+
+def get_history_store():
+    global _STORE
+    if _STORE is None or _STORE.path != HISTORY_DB:
+        _STORE = HistoryStore(HISTORY_DB)
+    return _STORE
+
+def history_available():
+    return os.path.exists(HISTORY_DB)
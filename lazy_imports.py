@@ -0,0 +1,60 @@
+import sys
+import time
+import importlib
+
+# =============================================================================
+# CHARGEMENT DIFFÉRÉ DES MODULES + MESURE DU TEMPS D'IMPORT
+# =============================================================================
+# Les pages (et leurs dépendances lourdes : matplotlib, plotly, scipy...) ne sont
+# importées qu'à leur première utilisation. Le coût du premier import de chaque
+# module est conservé pour le rapport de démarrage.
+#
+# Usage CLI (rapport à froid, dans un nouveau processus) :
+#   python lazy_imports.py
+
+# Modules mesurés par le rapport CLI (bibliothèques lourdes puis modules de l'app)
+STARTUP_MODULES = [
+    "streamlit", "pandas", "numpy", "plotly.graph_objects", "matplotlib.pyplot",
+    "scipy.stats", "openpyxl",
+    "utils", "profiling", "cmj",
+]
+
+# module -> secondes (premier import dans ce processus, dépendances comprises)
+IMPORT_TIMES = {}
+
+
+def load_module(name):
+    """Importe un module à la demande (une seule fois par processus) en mesurant son coût."""
+    module = sys.modules.get(name)
+    if module is not None: return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES[name] = time.perf_counter() - start
+    return module
+
+def import_timings():
+    """Temps d'import mesurés : liste (module, millisecondes), du plus lent au plus rapide."""
+    return sorted(((name, t * 1000) for name, t in IMPORT_TIMES.items()), key=lambda x: -x[1])
+
+def startup_report(modules=STARTUP_MODULES):
+    """
+    Importe les modules dans l'ordre et mesure le coût de chacun.
+    Le temps d'un module n'inclut pas les dépendances déjà chargées par les précédents.
+    """
+    rows = []
+    for name in modules:
+        already = name in sys.modules
+        try:
+            load_module(name)
+            rows.append((name, 0.0 if already else IMPORT_TIMES[name] * 1000, "déjà chargé" if already else ""))
+        except ImportError as e:
+            rows.append((name, None, f"absent ({e.name})"))
+    return rows
+
+
+if __name__ == "__main__":
+    total = 0.0
+    for name, ms, note in startup_report():
+        if ms is not None: total += ms
+        print(f"{name:<24} {('%.0f ms' % ms) if ms is not None else '-':>10}  {note}")
+    print(f"{'TOTAL':<24} {total:>7.0f} ms")
@@ -0,0 +1,62 @@
+import threading
+from collections import OrderedDict
+
+# =============================================================================
+# CACHE MÉMOIRE LRU (BORNÉ, THREAD-SAFE)
+# =============================================================================
+# Brique commune des caches du projet : tables par jeu de données, rapports,
+# PDF, images... Les valeurs sont calculées hors du verrou ; si deux threads
+# calculent la même clé en même temps, la première valeur enregistrée est gardée.
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Dictionnaire borné : les entrées les moins récemment utilisées sont évincées."""
+
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def get(self, key, default=None):
+        """Valeur de la clé (marquée comme récemment utilisée), ou default."""
+        with self._lock:
+            value = self._items.get(key, _MISSING)
+            if value is _MISSING: return default
+            self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """Enregistre (ou remplace) la valeur et évince les plus anciennes au-delà de max_items."""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def get_or_create(self, key, factory):
+        """Valeur de la clé ; sinon factory() est appelée (hors verrou) et son résultat enregistré."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING: return value
+        value = factory()
+        with self._lock:
+            existing = self._items.get(key, _MISSING)
+            if existing is not _MISSING:
+                self._items.move_to_end(key)
+                return existing
+            self._items[key] = value
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
@@ -1,9 +1,15 @@
 import streamlit as st
-from utils import load_data, local_css, SDR_RED
+import assets
+from lazy_imports import load_module, import_timings
+from perf import PERF_DEFAULT, PERF_LOG, start_run, finish_run, timer
+from chart_cache import chart_cache_stats
 
-# Imports des modules restants
-import profiling
-import cmj
+# Les pages (profiling, cmj) et leurs dépendances lourdes (matplotlib, plotly, scipy...)
+# sont importées à la première visite de la page, pas avant l'écran de mot de passe.
+PAGE_MODULES = {
+    "Profilage": "profiling",
+    "Recherche CMJ (Pro)": "cmj",
+}
 
 # 1. CONFIGURATION PAGE
 st.set_page_config(
@@ -26,10 +32,10 @@ def check_password():
     with col2:
         c1, c2, c3 = st.columns([1, 1, 1])
         with c2:
-            try:
-                st.image("logo_sdr.png", width=150)
-            except:
-                st.title("SDR")
+            # Logo lu une fois par processus (et non à chaque rerun)
+            logo = assets.logo_bytes()
+            if logo: st.image(logo, width=150)
+            else: st.title("SDR")
         
         st.markdown(f"<h3 style='text-align:center;'>ACCÈS RESTREINT</h3>", unsafe_allow_html=True)
         pwd = st.text_input("Mot de passe", type="password", label_visibility="collapsed")
@@ -49,16 +55,24 @@ if not check_password():
 # DÉBUT DE L'APPLICATION
 # ==============================================
 
+# Chronométrage du rerun (mode admin, interrupteur en bas de la barre latérale)
+st.session_state.setdefault("perf_admin", PERF_DEFAULT)
+perf_run = start_run("") if st.session_state["perf_admin"] else None
+
+with timer("import:utils"):
+    utils = load_module("utils")
+
 # 2. ACTIVATION DU DESIGN
-local_css()
+utils.local_css()
 
 # 3. CHARGEMENT DES DONNÉES
 # On charge une seule fois au début
-full_data = load_data()
+with timer("load_data"):
+    full_data = utils.load_data()
 
 # 4. BARRE LATÉRALE (NAVIGATION SIMPLIFIÉE)
 st.sidebar.markdown("## NAVIGATION")
-page = st.sidebar.radio("Aller vers :", ["Profilage", "Recherche CMJ (Pro)"], label_visibility="collapsed")
+page = st.sidebar.radio("Aller vers :", list(PAGE_MODULES), label_visibility="collapsed")
 
 st.sidebar.markdown("---")
 st.sidebar.info(f"Joueurs chargés : {len(full_data) if not full_data.empty else 0}")
@@ -77,22 +91,41 @@ if page == "Profilage":
             value=st.session_state.use_relative_mode,
             help="Activez pour voir les performances pondérées par le poids de corps."
         )
-# 5. AFFICHAGE DES PAGES
-if page == "Profilage":
-    # On passe full_data pour éviter de recharger dans profiling.py
-    profiling.show_profiling_page(full_data)
-
-elif page == "Recherche CMJ (Pro)":
-    # On appelle la fonction principale de ton module cmj.py
-    # Assure-toi que la fonction s'appelle bien show_cmj_page ou show_page dans cmj.py
-    try:
-        cmj.show_cmj_page(full_data)
-    except AttributeError:
-        # Fallback si le nom de la fonction est différent dans ton cmj.py actuel
-        try:
-            cmj.show_interface(full_data)
-        except:
-            st.error("Erreur : Impossible de trouver la fonction d'affichage dans cmj.py")
+# 5. AFFICHAGE DES PAGES (module importé à la première visite)
+if perf_run: perf_run.label = page
+with timer(f"import:{PAGE_MODULES[page]}"):
+    page_module = load_module(PAGE_MODULES[page])
+
+with timer(f"page:{page}"):
+    if page == "Profilage":
+        # On passe full_data pour éviter de recharger dans profiling.py
+        page_module.show_profiling_page(full_data)
+
+    elif page == "Recherche CMJ (Pro)":
+        page_module.show_page()
+
+# 6. MODE ADMIN : CHRONOMÉTRAGE DU RERUN + TEMPS DE CHARGEMENT DES MODULES
+st.sidebar.markdown("---")
+st.sidebar.toggle("⏱️ Mode admin (chronométrage)", key="perf_admin",
+                  help="Mesure la durée de chaque section à chaque rerun (journal : " + PERF_LOG + ").")
+
+if perf_run:
+    finish_run(perf_run)
+    with st.sidebar.expander(f"⏱️ Rerun : {perf_run.total * 1000:.0f} ms", expanded=True):
+        st.dataframe(
+            [{"Section": name, "Appels": n, "Total (ms)": round(tot, 1), "Max (ms)": round(mx, 1)}
+             for name, n, tot, mx in perf_run.rows()],
+            hide_index=True, use_container_width=True
+        )
+        timings = import_timings()
+        if timings:
+            st.markdown("**Chargement des modules**")
+            for name, ms in timings:
+                st.caption(f"{name} : {ms:.0f} ms")
+        cache = chart_cache_stats()
+        st.markdown("**Cache des graphiques**")
+        st.caption(f"{cache['hits']} hit(s) mémoire, {cache['disk_hits']} hit(s) disque, {cache['misses']} miss "
+                   f"({cache['hit_rate']:.0%}) — {cache['items']}/{cache['max_items']} image(s) en mémoire")
 
 
 # streamlit run main.py
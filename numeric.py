@@ -0,0 +1,132 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from data_cache import cached_per_dataset
+
+# =============================================================================
+# 1. NETTOYAGE NUMÉRIQUE (CELLULE ET COLONNE)
+# =============================================================================
+
+# Premier nombre trouvé dans le texte ("12,5 cm" -> 12.5)
+NUMERIC_PATTERN = r"[-+]?\d*\.\d+|\d+"
+_NUMERIC_RE = re.compile(NUMERIC_PATTERN)
+
+# Valeurs considérées comme "non renseigné"
+PLACEHOLDERS = ["", "-"]
+
+# Colonnes jamais converties
+TEXT_COLUMNS = ['Joueur']
+
+
+def _is_number(val):
+    return isinstance(val, (int, float, np.number))
+
+def clean_numeric_value(val):
+    """Version cellule par cellule (valeurs saisies à la main, hors DataFrame)."""
+    if pd.isna(val) or val == "" or val == "-": return None
+    try:
+        if _is_number(val): return float(val)
+        # Dates (cellule Excel auto-formatée) et autres objets : pas une mesure
+        if not isinstance(val, str): return None
+        val_str = val.replace(',', '.')
+        match = _NUMERIC_RE.search(val_str)
+        if match: return float(match.group())
+        return None
+    except: return None
+
+def _parse_series(s):
+    """(valeurs float, masque des cellules converties, colonne de mesures ?) d'une colonne."""
+    no_coercion = pd.Series(False, index=s.index)
+    if pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+        return s.astype(float), no_coercion, True
+
+    obj = s.astype(object)
+    kind = pd.api.types.infer_dtype(obj, skipna=True)
+    if kind == "empty":
+        return pd.Series(np.nan, index=s.index), no_coercion, False
+    if kind == "string":
+        is_text = obj.notna()
+        is_number = no_coercion
+    else:
+        is_text = obj.map(lambda v: isinstance(v, str))
+        is_number = obj.map(_is_number) & obj.notna()
+
+    text = obj.where(is_text, "").astype(str).str.strip()
+    dotted = text.str.replace(",", ".", regex=False)
+    parsed = pd.to_numeric(dotted.str.extract(f"({NUMERIC_PATTERN})", expand=False), errors='coerce')
+    # Nombres tels quels ; dates et autres objets -> NaN (comme clean_numeric_value)
+    direct = pd.to_numeric(obj.where(is_number), errors='coerce')
+    values = parsed.where(is_text, direct).astype(float)
+
+    # Colonne de mesures : au moins un nombre, ou un texte qui est un nombre (virgule admise).
+    # Les colonnes descriptives (Poste, Latéralité...) ne sont jamais signalées.
+    as_number = pd.to_numeric(dotted.where(is_text), errors='coerce')
+    is_metric = bool(is_number.any() or as_number.notna().any())
+    if not is_metric:
+        return values, no_coercion, False
+
+    as_is = pd.to_numeric(text, errors='coerce')
+    coerced = (is_text & ~text.isin(PLACEHOLDERS) & ~(as_is == parsed)) \
+        | (obj.notna() & ~is_text & ~is_number)
+    return values, coerced, True
+
+def clean_numeric_series(s):
+    """
+    Conversion vectorisée d'une colonne, mêmes règles que clean_numeric_value.
+    Retourne (valeurs float, masque 'convertie depuis du texte').
+    Une cellule est marquée convertie si son texte n'était pas un nombre tel quel
+    (virgule décimale, unité, texte sans nombre...) ou si ce n'était pas un nombre
+    (date...). Le masque est vide pour une colonne descriptive (Poste, Latéralité...).
+    """
+    values, coerced, _ = _parse_series(s)
+    return values, coerced
+
+def clean_numeric_frame(df, exclude=TEXT_COLUMNS):
+    """
+    Convertit toutes les colonnes (sauf exclude) :
+    (DataFrame float, DataFrame bool des cellules converties, liste des colonnes de mesures).
+    """
+    values, coerced, metrics = {}, {}, []
+    for c in df.columns:
+        if c in exclude: continue
+        values[c], coerced[c], is_metric = _parse_series(df[c])
+        if is_metric: metrics.append(c)
+    return (pd.DataFrame(values, index=df.index, columns=list(values)),
+            pd.DataFrame(coerced, index=df.index, columns=list(coerced)),
+            metrics)
+
+# =============================================================================
+# 2. CACHE PAR VERSION DE JEU DE DONNÉES
+# =============================================================================
+
+class NumericFrame:
+    """Valeurs numériques typées d'un jeu de données + masque des cellules converties."""
+
+    def __init__(self, df):
+        self.values, self.coerced, self.metric_columns = clean_numeric_frame(df)
+
+    def row(self, label):
+        """Valeurs d'une ligne : {colonne: float ou None}, comme clean_numeric_value."""
+        vals = self.values.loc[label]
+        if isinstance(vals, pd.DataFrame): vals = vals.iloc[0]
+        return {c: (None if pd.isna(v) else float(v)) for c, v in vals.items()}
+
+    def coerced_cells(self):
+        """Liste (ligne, colonne) des cellules converties depuis du texte."""
+        stacked = self.coerced.stack()
+        return list(stacked[stacked].index)
+
+
+@cached_per_dataset()
+def get_numeric_frame(df):
+    """NumericFrame du DataFrame (construit une seule fois par version)."""
+    return NumericFrame(df)
+
+def numeric_row(df, row):
+    """Valeurs nettoyées de la ligne row (Series issue de df) : {colonne: float ou None}."""
+    frame = get_numeric_frame(df)
+    if row.name in frame.values.index: return frame.row(row.name)
+    # Ligne hors du jeu de données (construite à la main) : conversion cellule par cellule
+    return {c: clean_numeric_value(v) for c, v in row.items() if c not in TEXT_COLUMNS}
@@ -0,0 +1,95 @@
+import os
+import hashlib
+
+from lru import LRUCache
+
+# =============================================================================
+# EXPORT PDF DES RAPPORTS (RENDU LOCAL HTML -> PDF)
+# =============================================================================
+# Le HTML de generate_report est converti en PDF A4 sur le serveur (WeasyPrint,
+# hors ligne, respecte la règle @page du rapport). WeasyPrint (requirements.txt)
+# a besoin des bibliothèques système Pango (packages.txt, ou apt install
+# libpango-1.0-0 libpangoft2-1.0-0). Sans elles, l'application propose le rapport HTML.
+#
+# Les PDF sont mémorisés par empreinte du HTML (mémoire + disque) : un rapport
+# inchangé n'est jamais rendu deux fois. Le cache disque est borné (les moins
+# récemment utilisés sont supprimés).
+
+PDF_CACHE_DIR = os.path.join(".cache", "pdf")
+
+# Nombre de PDF gardés en mémoire (un rapport ~ 100-500 Ko)
+PDF_MEMORY_ITEMS = 16
+
+# Nombre de PDF gardés sur disque (~ 100 Mo au plus)
+PDF_DISK_MAX_FILES = 200
+
+_PDFS = LRUCache(PDF_MEMORY_ITEMS)
+_AVAILABLE = None
+
+
+def pdf_available():
+    """Indique si le moteur de rendu PDF (WeasyPrint) est installé et utilisable (testé une fois)."""
+    global _AVAILABLE
+    if _AVAILABLE is None:
+        try:
+            import weasyprint  # noqa: F401
+            _AVAILABLE = True
+        except (ImportError, OSError):
+            # OSError : bibliothèques système (Pango) absentes
+            _AVAILABLE = False
+    return _AVAILABLE
+
+def _pdf_key(html):
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+def _disk_path(key):
+    return os.path.join(PDF_CACHE_DIR, f"{key}.pdf")
+
+def _prune_disk():
+    """Supprime les PDF les moins récemment utilisés au-delà de PDF_DISK_MAX_FILES."""
+    try:
+        entries = [e for e in os.scandir(PDF_CACHE_DIR) if e.name.endswith(".pdf")]
+        if len(entries) <= PDF_DISK_MAX_FILES: return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for e in entries[:len(entries) - PDF_DISK_MAX_FILES]:
+            os.remove(e.path)
+    except OSError:
+        pass
+
+def render_pdf(html):
+    """Rendu brut HTML -> PDF (bytes), sans cache."""
+    from weasyprint import HTML
+    return HTML(string=html, base_url=os.getcwd()).write_pdf()
+
+def html_to_pdf(html):
+    """PDF du rapport (bytes) : mémoire, puis disque, sinon rendu et mise en cache."""
+    key = _pdf_key(html)
+    pdf = _PDFS.get(key)
+    if pdf is not None: return pdf
+
+    try:
+        with open(_disk_path(key), "rb") as f:
+            pdf = f.read()
+        # Date de modification = dernier accès (ordre d'éviction du cache disque)
+        os.utime(_disk_path(key))
+        _PDFS.put(key, pdf)
+        return pdf
+    except OSError:
+        pass
+
+    pdf = render_pdf(html)
+    _PDFS.put(key, pdf)
+    try:
+        os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+        tmp = _disk_path(key) + ".tmp"
+        with open(tmp, "wb") as f: f.write(pdf)
+        os.replace(tmp, _disk_path(key))
+        _prune_disk()
+    except OSError:
+        # Le cache est une optimisation : un échec d'écriture ne bloque pas l'export
+        pass
+    return pdf
+
+def pdf_filename(html_filename):
+    """Profilage_X.html -> Profilage_X.pdf"""
+    return os.path.splitext(html_filename)[0] + ".pdf"
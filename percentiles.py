@@ -0,0 +1,279 @@
+import numpy as np
+import pandas as pd
+
+from data_cache import dataset_key, cached_per_dataset
+from lru import LRUCache
+from numeric import get_numeric_frame
+
+# =============================================================================
+# TABLE DE PERCENTILES (UNE PASSE PAR JEU DE DONNÉES)
+# =============================================================================
+
+def _numeric_values(df, columns=None):
+    """Valeurs déjà converties par get_numeric_frame (mêmes règles que numeric_row), colonnes de df."""
+    return get_numeric_frame(df).values.reindex(columns=list(df.columns) if columns is None else columns)
+
+class PercentileTable:
+    """
+    Lit la matrice de flottants du jeu de données (get_numeric_frame) et trie chaque colonne.
+    Percentile, rang, moyenne et maximum se lisent ensuite par recherche dichotomique
+    (np.searchsorted) au lieu de reconvertir + comparer à chaque appel.
+
+    Conventions identiques aux anciennes fonctions :
+      - percentile normal  : % de valeurs <= valeur
+      - percentile inversé : % de valeurs >= valeur (plus petit = mieux)
+      - rang 'min' (ex-aequo au meilleur rang), uniquement si la valeur existe dans l'effectif
+    """
+
+    def __init__(self, df):
+        self.index = df.index
+        self.columns = list(df.columns)
+        self._col_pos = {c: i for i, c in enumerate(self.columns)}
+        # Joueur de chaque ligne (pour la mise à jour incrémentale)
+        self.row_keys = df['Joueur'].to_numpy() if 'Joueur' in df.columns else None
+
+        self.matrix = _numeric_values(df).to_numpy(dtype=float)
+
+        self._sorted = []
+        self._mean = []
+        for i in range(self.matrix.shape[1]):
+            col = self.matrix[:, i]
+            valid = np.sort(col[~np.isnan(col)])
+            self._sorted.append(valid)
+            self._mean.append(valid.mean() if valid.size else np.nan)
+
+    def apply_diff(self, new_df, diff):
+        """
+        Table du nouveau jeu de données en ne recalculant que les colonnes de diff.changed_columns :
+        les autres colonnes (valeurs et tableaux triés) sont reprises telles quelles, et dans les
+        colonnes touchées seules les valeurs des joueurs modifiés/ajoutés/retirés sont retirées
+        puis réinsérées dans le tableau trié.
+        """
+        if diff.full or self.row_keys is None or list(new_df.columns) != self.columns \
+                or 'Joueur' not in new_df.columns:
+            return PercentileTable(new_df)
+
+        old_pos = {k: i for i, k in enumerate(self.row_keys)}
+        new_keys = new_df['Joueur'].to_numpy()
+        new_pos = {k: i for i, k in enumerate(new_keys)}
+        if len(old_pos) != len(self.row_keys) or len(new_pos) != len(new_keys):
+            return PercentileTable(new_df)
+
+        # Lignes reprises de l'ancienne matrice (NaN pour les joueurs ajoutés)
+        src = np.array([old_pos.get(k, -1) for k in new_keys], dtype=int)
+        matrix = np.full((len(new_keys), len(self.columns)), np.nan)
+        kept = src >= 0
+        matrix[kept] = self.matrix[src[kept]]
+
+        affected = [c for c in self.columns if c in diff.changed_columns]
+        if affected:
+            aff_pos = [self._col_pos[c] for c in affected]
+            matrix[:, aff_pos] = _numeric_values(new_df, affected).to_numpy(dtype=float)
+
+        rows_out = [old_pos[p] for p in list(diff.changed) + list(diff.removed) if p in old_pos]
+        rows_in = [new_pos[p] for p in list(diff.changed) + list(diff.added) if p in new_pos]
+
+        table = PercentileTable.__new__(PercentileTable)
+        table.index = new_df.index
+        table.columns = self.columns
+        table._col_pos = self._col_pos
+        table.row_keys = new_keys
+        table.matrix = matrix
+        table._sorted = list(self._sorted)
+        table._mean = list(self._mean)
+        for c in affected:
+            pos = self._col_pos[c]
+            valid = _remove_sorted(self._sorted[pos], self.matrix[rows_out, pos])
+            valid = _insert_sorted(valid, matrix[rows_in, pos])
+            table._sorted[pos] = valid
+            table._mean[pos] = valid.mean() if valid.size else np.nan
+        return table
+
+    def _valid(self, col_name):
+        pos = self._col_pos.get(col_name)
+        if pos is None: return None, None
+        return pos, self._sorted[pos]
+
+    def percentile(self, col_name, value, inverted=False):
+        """Retourne (moyenne, percentile) ; (0, 0) si la colonne ou la valeur manque."""
+        if value is None or pd.isna(value): return 0, 0
+        pos, valid = self._valid(col_name)
+        if valid is None or valid.size == 0: return 0, 0
+
+        n = valid.size
+        if inverted:
+            count = n - np.searchsorted(valid, value, side='left')
+        else:
+            count = np.searchsorted(valid, value, side='right')
+        return self._mean[pos], count / n * 100
+
+    def rank(self, col_name, value, inverted=False):
+        """Retourne (rang, effectif) ; ("-", "-") si la valeur n'est pas dans l'effectif."""
+        if value is None or pd.isna(value): return "-", "-"
+        _, valid = self._valid(col_name)
+        if valid is None or valid.size == 0: return "-", "-"
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return "-", "-"
+
+        n = valid.size
+        left = np.searchsorted(valid, value, side='left')
+        if left >= n or valid[left] != value: return "-", "-"
+        if inverted:
+            return int(left) + 1, n
+        right = np.searchsorted(valid, value, side='right')
+        return int(n - right) + 1, n
+
+    def mean(self, col_name):
+        pos, valid = self._valid(col_name)
+        if valid is None or valid.size == 0: return np.nan
+        return self._mean[pos]
+
+    def max(self, col_name):
+        _, valid = self._valid(col_name)
+        if valid is None or valid.size == 0: return np.nan
+        return valid[-1]
+
+    def percentile_frame(self, columns=None, is_inverted=None):
+        """
+        Percentiles de tous les joueurs pour toutes les colonnes demandées, en une passe vectorisée.
+        is_inverted : fonction (nom_colonne -> bool) ; par défaut aucune colonne inversée.
+        """
+        columns = self.columns if columns is None else [c for c in columns if c in self._col_pos]
+        out = {}
+        for c in columns:
+            pos = self._col_pos[c]
+            valid = self._sorted[pos]
+            col = self.matrix[:, pos]
+            if valid.size == 0:
+                out[c] = np.full(col.shape, np.nan)
+                continue
+            if is_inverted is not None and is_inverted(c):
+                counts = valid.size - np.searchsorted(valid, col, side='left')
+            else:
+                counts = np.searchsorted(valid, col, side='right')
+            pct = counts / valid.size * 100
+            pct[np.isnan(col)] = np.nan
+            out[c] = pct
+        return pd.DataFrame(out, index=self.index)
+
+def _remove_sorted(valid, values):
+    """Retire une occurrence de chaque valeur (non NaN) du tableau trié."""
+    values = np.sort(values[~np.isnan(values)])
+    if values.size == 0: return valid
+    left = np.searchsorted(valid, values, side='left')
+    # Valeurs répétées : occurrences successives
+    offset = np.arange(values.size) - np.searchsorted(values, values, side='left')
+    return np.delete(valid, left + offset)
+
+def _insert_sorted(valid, values):
+    """Insère les valeurs (non NaN) dans le tableau trié."""
+    values = np.sort(values[~np.isnan(values)])
+    if values.size == 0: return valid
+    return np.insert(valid, np.searchsorted(valid, values), values)
+
+# =============================================================================
+# CACHE PAR VERSION DE JEU DE DONNÉES
+# =============================================================================
+
+@cached_per_dataset()
+def get_percentile_table(df):
+    """Retourne la table de percentiles du DataFrame (construite une seule fois par version)."""
+    return PercentileTable(df)
+
+def register_percentile_table(df, table):
+    """Enregistre une table déjà construite (ex : transmise aux processus de génération en lot)."""
+    get_percentile_table.cache.put(dataset_key(df), table)
+
+def update_percentile_table(old_df, new_df, diff):
+    """
+    Construit la table de new_df à partir de celle de old_df (si elle est en cache)
+    en ne recalculant que ce que diff a modifié.
+    """
+    old_table = get_percentile_table.cache.get(dataset_key(old_df))
+    if old_table is None: return get_percentile_table(new_df)
+
+    table = old_table.apply_diff(new_df, diff)
+    register_percentile_table(new_df, table)
+    return table
+
+# =============================================================================
+# PERCENTILES PAR COHORTE (POSTE OU AUTRE COLONNE CATÉGORIELLE)
+# =============================================================================
+
+class CohortPercentileTable:
+    """
+    Percentile de chaque joueur au sein de son groupe (ex : même poste), pour toutes les
+    colonnes, en un seul groupby().rank(pct=True) vectorisé.
+    Mêmes conventions que PercentileTable : rang 'max' croissant = % de valeurs <= valeur,
+    rang 'max' décroissant = % de valeurs >= valeur (métriques inversées).
+    Classe les valeurs de get_numeric_frame ("12,5 cm" compte comme 12.5, comme dans la fiche).
+    """
+
+    def __init__(self, df, groups):
+        self.numeric = _numeric_values(df)
+        self.groups = groups.reindex(df.index)
+        grouped = self.numeric.groupby(self.groups)
+        self.pct = grouped.rank(method='max', pct=True) * 100
+        self.pct_inverted = grouped.rank(method='max', pct=True, ascending=False) * 100
+        self.means = grouped.mean()
+        self._sorted = {}  # (groupe, colonne) -> valeurs triées, calculées à la demande
+
+    def sorted_values(self, group, col_name):
+        key = (group, col_name)
+        valid = self._sorted.get(key)
+        if valid is None:
+            col = self.numeric.loc[(self.groups == group).to_numpy(), col_name].to_numpy(dtype=float)
+            valid = self._sorted[key] = np.sort(col[~np.isnan(col)])
+        return valid
+
+    def for_row(self, label):
+        """Cohorte de la ligne label, ou None si son groupe n'est pas renseigné."""
+        if label not in self.groups.index: return None
+        group = self.groups.at[label]
+        if pd.isna(group): return None
+        return Cohort(self, label, group)
+
+
+class Cohort:
+    """Cohorte d'un joueur : lit les percentiles pré-calculés de sa ligne."""
+
+    def __init__(self, table, label, group):
+        self.table = table
+        self.label = label
+        self.group = group
+        self.members = table.groups.index[(table.groups == group).to_numpy()]
+        self.size = len(self.members)
+
+    def percentile(self, col_name, value, inverted=False):
+        """(moyenne de la cohorte, percentile) ; (0, 0) si la valeur manque, None si la colonne est inconnue."""
+        t = self.table
+        if col_name not in t.pct.columns: return None
+        if value is None or pd.isna(value): return 0, 0
+        mean = t.means.at[self.group, col_name]
+
+        # Cas courant : valeur du joueur lui-même -> rang déjà calculé
+        if t.numeric.at[self.label, col_name] == value:
+            pct = (t.pct_inverted if inverted else t.pct).at[self.label, col_name]
+            return mean, float(pct)
+
+        valid = t.sorted_values(self.group, col_name)
+        if valid.size == 0: return 0, 0
+        n = valid.size
+        if inverted:
+            count = n - np.searchsorted(valid, value, side='left')
+        else:
+            count = np.searchsorted(valid, value, side='right')
+        return mean, count / n * 100
+
+
+_COHORTS = LRUCache(max_items=8)
+
+def get_cohort_table(df, by, groups=None):
+    """
+    Table des percentiles par cohorte (construite une seule fois par version et par colonne de groupe).
+    groups : Series des groupes (même index que df) ; par défaut df[by].
+    """
+    return _COHORTS.get_or_create(dataset_key(df, by),
+                                  lambda: CohortPercentileTable(df, df[by] if groups is None else groups))
@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import datetime
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# =============================================================================
+# CHRONOMÉTRAGE DES RERUNS (INSTRUMENTATION)
+# =============================================================================
+# Un "run" = une exécution du script Streamlit. Les fonctions décorées par @timed
+# (ou les blocs "with timer(...)") ajoutent leur durée au run courant ; hors run
+# (mode admin désactivé, CLI, processus de génération en lot) rien n'est mesuré.
+
+# Activé par défaut si la variable d'environnement est définie
+PERF_DEFAULT = os.environ.get("SDR_PERF", "") not in ("", "0")
+
+# Journal JSON (une ligne par rerun)
+PERF_LOG = os.path.join(".cache", "perf.jsonl")
+
+_CURRENT_RUN = ContextVar("perf_run", default=None)
+_LOG_LOCK = threading.Lock()
+
+
+class PerfRun:
+    """Durées et nombre d'appels par section pour un rerun."""
+
+    def __init__(self, label):
+        self.label = label
+        self.started = time.perf_counter()
+        self.timestamp = datetime.datetime.now().isoformat(timespec="seconds")
+        self.total = None
+        self.sections = {}  # nom -> [nb_appels, durée_totale, durée_max]
+
+    def add(self, name, elapsed):
+        entry = self.sections.get(name)
+        if entry is None:
+            self.sections[name] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]: entry[2] = elapsed
+
+    def rows(self):
+        """[(section, appels, total_ms, max_ms)] du plus coûteux au moins coûteux."""
+        return sorted(((name, n, tot * 1000, mx * 1000) for name, (n, tot, mx) in self.sections.items()),
+                      key=lambda r: -r[2])
+
+    def to_dict(self):
+        return {
+            "ts": self.timestamp,
+            "page": self.label,
+            "total_ms": round((self.total or 0) * 1000, 1),
+            "sections": {name: {"appels": n, "total_ms": round(tot, 1), "max_ms": round(mx, 1)}
+                         for name, n, tot, mx in self.rows()},
+        }
+
+
+def start_run(label):
+    """Démarre le chronométrage du rerun courant."""
+    run = PerfRun(label)
+    _CURRENT_RUN.set(run)
+    return run
+
+def _write_log(run, log_path):
+    try:
+        os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+        with _LOG_LOCK, open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run.to_dict(), ensure_ascii=False) + "\n")
+    except OSError:
+        pass
+
+def finish_run(run, log_path=PERF_LOG):
+    """Clôt le run et l'ajoute au journal JSON (si log_path)."""
+    if run is None: return None
+    run.total = time.perf_counter() - run.started
+    _CURRENT_RUN.set(None)
+    if log_path: _write_log(run, log_path)
+    return run
+
+@contextmanager
+def deferred_run(label, enabled=True, log_path=PERF_LOG):
+    """
+    Run séparé pour un travail exécuté après le rerun (ex : callable d'un download_button,
+    appelé sur un autre thread) : chronométré puis ajouté au journal JSON, sans toucher au run courant.
+    """
+    if not enabled:
+        yield None
+        return
+    run = PerfRun(label)
+    token = _CURRENT_RUN.set(run)
+    try:
+        yield run
+    finally:
+        _CURRENT_RUN.reset(token)
+        run.total = time.perf_counter() - run.started
+        if log_path: _write_log(run, log_path)
+
+def current_run():
+    return _CURRENT_RUN.get()
+
+@contextmanager
+def timer(name):
+    """Bloc chronométré : with timer("section"): ..."""
+    run = _CURRENT_RUN.get()
+    if run is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add(name, time.perf_counter() - start)
+
+def timed(name=None):
+    """Décorateur : chronomètre chaque appel de la fonction dans le run courant."""
+    def decorator(func):
+        label = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            run = _CURRENT_RUN.get()
+            if run is None: return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                run.add(label, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def read_log(log_path=PERF_LOG, last=50):
+    """Dernières entrées du journal JSON."""
+    try:
+        with open(log_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()[-last:]
+    except OSError:
+        return []
+    return [json.loads(line) for line in lines if line.strip()]
@@ -0,0 +1,94 @@
+import numpy as np
+
+from column_resolver import get_column_resolver
+from data_cache import cached_per_dataset
+from lru import LRUCache
+from numeric import get_numeric_frame
+
+# =============================================================================
+# JEU DE DONNÉES INDEXÉ PAR JOUEUR ET PAR POSTE
+# =============================================================================
+# Index construits une fois par version du jeu de données : la ligne d'un joueur
+# (ou les lignes d'un poste) s'obtient sans parcourir tout le DataFrame.
+# En cas de doublon, c'est la première ligne du joueur qui est retenue
+# (même comportement que df[df['Joueur'] == p].iloc[0]).
+#
+# Les vues filtrées par postes (valeurs numériques) sont gardées par jeu de données
+# et partagées par tous les graphiques : elles ne doivent pas être modifiées.
+
+
+class PlayerDataset:
+    """DataFrame de profilage + index Joueur -> ligne et Poste -> lignes."""
+
+    def __init__(self, df):
+        self.df = df
+        names = df['Joueur'].to_numpy()
+        first = ~df['Joueur'].duplicated().to_numpy()
+        self._positions = dict(zip(names[first], np.flatnonzero(first)))
+        self.players = sorted(self._positions)
+
+        self.position_column = get_column_resolver(df).find("Poste")
+        self._by_position = {}
+        if self.position_column:
+            postes = df[self.position_column]
+            for poste, idx in postes.groupby(postes, sort=True).indices.items():
+                self._by_position[poste] = idx
+        self.positions = list(self._by_position)
+        self._views = LRUCache(_VIEWS_SIZE)
+
+    def __contains__(self, player):
+        return player in self._positions
+
+    def row(self, player):
+        """Ligne du joueur (Series), ou None s'il est absent."""
+        pos = self._positions.get(player)
+        return None if pos is None else self.df.iloc[pos]
+
+    def label(self, player):
+        """Étiquette d'index de la ligne du joueur dans df (et dans tout sous-ensemble filtré de df)."""
+        pos = self._positions.get(player)
+        return None if pos is None else self.df.index[pos]
+
+    def position_rows(self, postes):
+        """Positions (triées) des lignes des postes demandés."""
+        idx = [self._by_position[p] for p in postes if p in self._by_position]
+        if not idx: return np.array([], dtype=int)
+        return np.sort(np.concatenate(idx))
+
+    def by_position(self, postes):
+        """Sous-ensemble du DataFrame limité aux postes demandés."""
+        return self.df.iloc[self.position_rows(postes)]
+
+    def position_view(self, postes=None):
+        """
+        Vue numérique en lecture seule : Joueur, Poste (texte) et toutes les métriques (float),
+        limitée aux postes demandés (tout l'effectif si postes est vide ou None).
+        Construite une fois par sélection de postes ; index identique à celui de df.
+        """
+        key = frozenset(postes) if postes else None
+        return self._views.get_or_create(key, lambda: self._build_view(key))
+
+    def _build_view(self, postes):
+        values = get_numeric_frame(self.df).values
+        rows = self.position_rows(postes) if postes is not None else np.arange(len(self.df))
+        view = values.take(rows)
+        view.insert(0, 'Joueur', self.df['Joueur'].to_numpy()[rows])
+        if self.position_column:
+            view[self.position_column] = self.df[self.position_column].to_numpy()[rows]
+        return view
+
+
+_VIEWS_SIZE = 8  # sélections de postes gardées par jeu de données
+
+@cached_per_dataset()
+def get_player_dataset(df):
+    """PlayerDataset du DataFrame (index construits une seule fois par version)."""
+    return PlayerDataset(df)
+
+def move_to_end(frame, label):
+    """frame avec la ligne label placée en dernier (tracée au premier plan), sans tri."""
+    if label is None or label not in frame.index: return frame
+    pos = frame.index.get_loc(label)
+    if not isinstance(pos, (int, np.integer)): return frame
+    order = np.r_[np.arange(pos), np.arange(pos + 1, len(frame)), pos]
+    return frame.iloc[order]
@@ -2,52 +2,34 @@ import streamlit as st
 import pandas as pd
 import base64
 import os
-import re
 import unicodedata
-import matplotlib.pyplot as plt
 import numpy as np
 from math import pi
 from io import BytesIO
-from scipy import stats
 
 # Imports existants
 from utils import SDR_RED
-from team_profiling import show_team_page
-from profiling_report import generate_report
+from profiling_report import get_report
+from pdf_export import pdf_available, html_to_pdf
+from data_cache import load_profiling_workbook, dataset_version
+from column_resolver import get_column_resolver
+from percentiles import get_percentile_table, update_percentile_table, get_cohort_table
+from dataset_diff import diff_datasets
+from numeric import clean_numeric_value, numeric_row, get_numeric_frame
+from player_dataset import get_player_dataset
+from history_store import get_history_store, history_available
+from chart_cache import cached_chart
+from radar_render import radar_svg, radar_plotly, multi_radar_svg, multi_radar_plotly
+import assets
+from perf import timed, timer, current_run, deferred_run
 
 # On garde les configs si besoin
-from config_rapport import OFFICIAL_STRUCTURE, REPORT_NORMES, UNITS
+from config_rapport import OFFICIAL_STRUCTURE, REPORT_NORMES, UNITS, COL_MAPPING
 
 # =============================================================================
 # CONFIGURATION LOCALE & MAPPINGS
 # =============================================================================
 
-# Mapping pour faire correspondre les Libellés UI -> Colonnes Excel
-COL_MAPPING = {
-    "Knee To Wall (G)": "Knee To Wall - Gauche", "Knee To Wall (D)": "Knee To Wall - Droite",
-    "Sit And Reach": "Sit And Reach",
-    "Somme ADD": "Somme ADD", "Adducteurs (G)": "Adducteurs - Gauche", "Adducteurs (D)": "Adducteurs - Droite",
-    "Ratio Squeeze": "Ratio Squeeze (ADD/ABD)",
-    "Somme ABD": "Somme ABD", "Abducteurs (G)": "Abducteurs - Gauche ", 
-    "Abducteurs (D)": "Abducteurs - Droite (N/kg)", 
-    "Nordic Ischio (G)": "Nordic Ischio - Gauche", "Nordic Ischio (D)": "Nordic Ischio - Droite",
-    "Landing (G)": "Landing G (N/kg)", "Landing (D)": "Landing Dt (N/kg)", "Landing %": "Landing %",
-    "Q Conc 60° (G)": "Q G conc 60°/s", "Q Conc 60° (D)": "Q Dt conc 60°/s",
-    "Q Conc 240° (G)": "Q G conc 240°/s", "Q Conc 240° (D)": "Q Dt conc 240°/s",
-    "IJ Conc 60° (G)": "IJ G conc 60°/s", "IJ Conc 60° (D)": "IJ Dt conc 60°/s",
-    "IJ Conc 240° (G)": "IJ G conc 240°/s", "IJ Conc 240° (D)": "IJ Dt conc 240°/s",
-    "IJ Exc 30° (G)": "IJ G Exc 30°/s", "IJ Exc 30° (D)": "IJ Dt exc 30°/s",
-    "Score Sommeil": "Score Sommeil", "Score Nutrition": "Score Nutrition",
-    "CMJ (cm)": "CMJ (cm)", "Wattbike (6s)": "Wattbike 6s (W)",
-    "Squat Keiser": "Keiser squat R=100", "Tirage Dos Keiser": "Tirage dos Keiser",
-    "Développé couché (W)": "Developpé couché (W)",
-    "Développé couché (W/kg)": "Developpé couché (W/kg)", "Landmine Throw": "Landmine throw",
-    "VMA": "VMA", "Temps 10m (Terrain)": "Temps 10m", "5-0-5": "5 - 0 - 5",
-    "Distance Totale": "Distance totale", "Distance HSR": "Distance HSR", "Distance Sprint (92% Vmax)": "Distance Sprint (92% Vmax)",
-    "Nb Accélérations": "Nb Acc", "Nb Décélérations": "Nb Dec",
-    "Vmax": "Vmax", "Amax": "Amax", "Dmax": "Dmax"
-}
-
 # Mapping pour les valeurs relatives (tooltips)
 REL_COL_MAPPING = {
     "Somme ADD": "Somme ADD (N/kg)", "Somme ABD": "Somme ABD (N/kg)",
@@ -63,52 +45,16 @@ REL_COL_MAPPING = {
     "Développé couché (W)": "Developpé couché (W/kg)","Q Exc 30° (G)": "Q G exc 30°/s (N/kg)", "Q Exc 30° (D)": "Q Dt exc 30°/s (N/kg)"
 }
 
+# Rendu des radars : 'plotly' (vectoriel) sur la page, 'svg' dans le rapport HTML
+PAGE_RADAR_BACKEND = "plotly"
+REPORT_RADAR_BACKEND = "svg"
+
 # Sources (si non importées depuis configrapport)
 SOURCES_CONFIG = {
     "Q Conc 60°": "Scientifique", "Q Conc 240°": "Scientifique", 
     "IJ Conc 60°": "Scientifique", "IJ Conc 240°": "Scientifique", "IJ Exc 30°": "Scientifique"
 }
 
-KEYWORD_MAPPING = {
-    "Taille": ["taille", "height"], "Poids": ["poids", "weight"],
-    "Masse Grasse Plis (mm)": ["masse grasse", "fat", "img"],
-    "Numéro": ["numero", "numéro", "number", "maillot"],
-    "Poste": ["poste", "position"], "Latéralité": ["latéralité", "laterality", "pied"],
-    "Knee To Wall (G)": ["knee to wall - gauche", "ktw g"], "Knee To Wall (D)": ["knee to wall - droite", "ktw d"],
-    "Sit And Reach": ["sit and reach", "souplesse"],
-    "Adducteurs (G)": ["adducteurs - gauche", "add g"], "Adducteurs (D)": ["adducteurs - droite", "add d"],
-    "Abducteurs (G)": ["abducteurs - gauche", "abd g"], "Abducteurs (D)": ["abducteurs - droite", "abd d"],
-    "Nordic Ischio (G)": ["nordic ischio - gauche", "nordic g"], "Nordic Ischio (D)": ["nordic ischio - droite", "nordic d"],
-    "Landing (G)": ["landing g"], "Landing (D)": ["landing dt", "landing d"],
-    "Landing %": ["landing %", "landing", "asymétrie landing"],
-    "Q Conc 60° (G)": ["q g conc 60"], "Q Conc 60° (D)": ["q dt conc 60"],
-    "Q Conc 240° (G)": ["q g conc 240"], "Q Conc 240° (D)": ["q dt conc 240"],
-    "IJ Conc 60° (G)": ["ij g conc 60"], "IJ Conc 60° (D)": ["ij dt conc 60"],
-    "IJ Conc 240° (G)": ["ij g conc 240"], "IJ Conc 240° (D)": ["ij dt conc 240"],
-    "IJ Exc 30° (G)": ["ij g exc 30"], "IJ Exc 30° (D)": ["ij dt exc 30"],
-    "Q Exc 30° (G)": ["q g exc 30", "quad g exc 30"], 
-    "Q Exc 30° (D)": ["q dt exc 30", "quad dt exc 30"],
-    "Ratio Mixte (G)": ["ratio mixte g", "mixte g"], 
-    "Ratio Mixte (D)": ["ratio mixte dt", "mixte d", "mixte dt", "ratio mixte d"],
-    "Score Sommeil": ["score sommeil", "sommeil"], "Score Nutrition": ["score nutrition", "nutrition"],
-    "CMJ (cm)": ["cmj", "saut"], "Wattbike 6s (W)": ["wattbike"],
-    "Squat Keiser": ["keiser squat", "squat r=100"], "Tirage Dos Keiser": ["tirage dos"],
-    
-    
-    "Développé couché (W)" : ["developpé couché (W)", "couché (W)"], 
-    "Développé couché (W/kg)" : ["developpé couché (W/kg)", "couché (W/kg)"],
-    
-    "Landmine Throw": ["landmine"],
-    "10m 1080 (s)": ["10m 1080", "1080"],
-    "VMA": ["vma"], "SV1": ["sv1"], "SV2": ["sv2"],
-    "Temps 10m (Terrain)": ["temps 10m", "chrono 10m"], "5-0-5": ["5 - 0 - 5", "505"],
-    "Distance Totale": ["distance totale", "total dist"], "Distance HSR": ["distance hsr", "hsr"],
-    "Distance Sprint (92% Vmax)" : ["distance sprint", "sprint"],
-    "Nb Accélérations": ["nb acc"], "Nb Décélérations": ["nb dec"],
-    "Vmax": ["vmax"], "Amax": ["amax"], "Dmax": ["dmax"],
-    "Score Sommeil": ["score sommeil", "sommeil"], "Score Nutrition": ["score nutrition", "nutrition"],
-}
-
 
 
 
@@ -122,45 +68,32 @@ def is_inverted(label):
     keywords = ['temps', 'chrono', '10m', '505', 'agilité', 'masse grasse', 'landing', "Landing %"]
     return any(x in str(label).lower() for x in keywords)
 
-def clean_numeric_value(val):
-    if pd.isna(val) or val == "" or val == "-": return None
-    try:
-        if isinstance(val, (int, float)): return float(val)
-        val_str = str(val).replace(',', '.')
-        match = re.search(r"[-+]?\d*\.\d+|\d+", val_str)
-        if match: return float(match.group())
-        return None
-    except: return None
-
-
 # calcul des percentiles (avec sécurité rajouté )
-def calculate_percentile(df, col_name, value):
-    if col_name not in df.columns or pd.isna(value): return 0, 0
-    valid_values = pd.to_numeric(df[col_name], errors='coerce').dropna()
-    if valid_values.empty: return 0, 0
-    mean_val = valid_values.mean()
-    inverted = is_inverted(col_name)
-    
-    if inverted:
-        percentile = (valid_values >= value).mean() * 100
-    else:
-        percentile = (valid_values <= value).mean() * 100
-    return mean_val, percentile
+@timed()
+def calculate_percentile(df, col_name, value, cohort=None):
+    # Cohorte (ex : même poste) : rang pré-calculé par un groupby unique ; sinon tout l'effectif
+    if cohort is not None:
+        res = cohort.percentile(col_name, value, inverted=is_inverted(col_name))
+        if res is not None: return res
+    # Lecture dans la table pré-calculée (une conversion + un tri par colonne et par jeu de données)
+    return get_percentile_table(df).percentile(col_name, value, inverted=is_inverted(col_name))
+
+# Colonnes proposées comme cohorte de comparaison : texte, entre 2 et COHORT_MAX_GROUPS groupes
+COHORT_MAX_GROUPS = 20
+
+def cohort_columns(df):
+    """Colonnes catégorielles utilisables comme cohorte : le poste d'abord, puis les autres."""
+    col_poste = find_column_in_df(df, "Poste")
+    cols = [col_poste] if col_poste else []
+    metrics = set(get_numeric_frame(df).metric_columns)
+    for c in df.columns:
+        if c == 'Joueur' or c in cols or df[c].dtype != object: continue
+        if c in metrics: continue  # colonne de mesures saisies en texte
+        if 2 <= df[c].nunique(dropna=True) <= COHORT_MAX_GROUPS: cols.append(c)
+    return cols
 
 def calculate_rank_info(df, col_name, value):
-    if col_name not in df.columns or pd.isna(value): return "-", "-"
-    valid_data = pd.to_numeric(df[col_name], errors='coerce').dropna()
-    if valid_data.empty: return "-", "-"
-    inverted = is_inverted(col_name)
-    ranked = valid_data.rank(method='min', ascending=inverted)
-    try:
-        matches = ranked[valid_data == float(value)]
-        if not matches.empty:
-            player_rank = int(matches.iloc[0])
-            total = len(valid_data)
-            return player_rank, total
-        return "-", "-"
-    except: return "-", "-"
+    return get_percentile_table(df).rank(col_name, value, inverted=is_inverted(col_name))
 
 # calcul des asymétries
 def get_asymmetry(df_row, metric_label, df):
@@ -169,8 +102,8 @@ def get_asymmetry(df_row, metric_label, df):
     col_g = find_column_in_df(df, metric_label)
     col_d = find_column_in_df(df, metric_label_d)
     if not col_g or not col_d: return None
-    val_g = clean_numeric_value(df_row.get(col_g))
-    val_d = clean_numeric_value(df_row.get(col_d))
+    row_num = numeric_row(df, df_row)
+    val_g, val_d = row_num.get(col_g), row_num.get(col_d)
     if val_g is None or val_d is None: return None
     try:
         max_val = max(val_g, val_d)
@@ -180,64 +113,31 @@ def get_asymmetry(df_row, metric_label, df):
     except: return None
 
 def find_column_in_df(df, label):
-    keywords = KEYWORD_MAPPING.get(label, [])
-    keywords_clean = [remove_accents(k).lower().strip() for k in keywords]
-    df_cols_clean = [remove_accents(str(c)).lower().strip() for c in df.columns]
-    for k in keywords_clean:
-        for idx, col_name in enumerate(df_cols_clean):
-            if k in col_name: return df.columns[idx]
-    return None
+    # Résolution O(1) via l'index partagé (construit une fois par schéma)
+    return get_column_resolver(df).find(label)
 
 # trouver le numéro (au cas ou ça change)
 def find_number_column(df):
-    cols_map = {remove_accents(str(c)).lower().strip(): c for c in df.columns}
-    targets = ['numero', 'numéro', 'number', 'maillot', 'shirt', 'n°']
-    for t in targets:
-        if t in cols_map: return cols_map[t]
-    for c_clean, c_original in cols_map.items():
-        if c_clean.startswith("num") or c_clean == "n°": return c_original
-    return None
+    return get_column_resolver(df).number_column()
 
 def img_to_b64(img_path):
-    try:
-        with open(img_path, "rb") as f: return base64.b64encode(f.read()).decode()
-    except: return ""
+    return assets.get_asset_b64(img_path)
 
-# ajout des photos des joueurs
+# ajout des photos des joueurs (index construit une fois, invalidé par le mtime du dossier)
 def get_best_photo_path(player_name):
-    folder = "Photos"
-    if not os.path.exists(folder): return None
-    
-    files_map = {f.lower(): f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f))}
-    
-    clean_name = player_name.strip()
-    parts = clean_name.split()
-    
-    candidates = []
-    candidates.append(clean_name)
-    
-    if len(parts) > 1:
-        inverted = f"{parts[-1]} {' '.join(parts[:-1])}"
-        candidates.append(inverted)
-        
-        candidates.append(f"{' '.join(parts[1:])} {parts[0]}")
-
-    extensions = [".jpg", ".png", ".jpeg"]
-    
-    for cand in candidates:
-        for ext in extensions:
-            target_key = f"{cand}{ext}".lower()
-            if target_key in files_map:
-                return os.path.join(folder, files_map[target_key])
-            
-    return None
+    return assets.get_best_photo_path(player_name)
 
-def create_radar_chart(categories, values, text_color="white"):
+@timed("radar")
+@cached_chart
+def create_radar_chart(categories, values, text_color="white", backend="png"):
     """
     Génère un graphique radar avec des zones de performance (0-33% rouge, 66-100% vert).
-    Retourne l'image encodée en base64.
+    Retourne l'image encodée en base64 (backend 'png'), une chaîne SVG ('svg')
+    ou une figure Plotly ('plotly').
     """
     if not categories: return ""
+    if backend == "svg": return radar_svg(categories, values, text_color=text_color)
+    if backend == "plotly": return radar_plotly(categories, values, text_color=text_color)
     
     # Nombre de variables
     N = len(categories)
@@ -248,6 +148,7 @@ def create_radar_chart(categories, values, text_color="white"):
     angles += angles[:1]
     
     # Création de la figure
+    import matplotlib.pyplot as plt # import différé : seul le rendu PNG l'utilise
     fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
     
     # --- Zones de fond (Contextualisation) ---
@@ -293,8 +194,12 @@ def create_radar_chart(categories, values, text_color="white"):
     
     return img_b64
 
-def create_multi_radar_chart(categories, values_l, values_r, values_norm, max_val=5.0):
+@timed("radar_multi")
+@cached_chart
+def create_multi_radar_chart(categories, values_l, values_r, values_norm, max_val=5.0, backend="png"):
     if not categories: return ""
+    if backend == "svg": return multi_radar_svg(categories, values_l, values_r, values_norm, max_val)
+    if backend == "plotly": return multi_radar_plotly(categories, values_l, values_r, values_norm, max_val)
     N = len(categories)
     angles = [n / float(N) * 2 * pi for n in range(N)]
     angles += angles[:1]
@@ -304,6 +209,7 @@ def create_multi_radar_chart(categories, values_l, values_r, values_norm, max_va
     v_r = values_r + values_r[:1]
     v_n = values_norm + values_norm[:1]
     
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
     
     # Axes et Grille
@@ -438,8 +344,8 @@ def get_asym_badge_info(val_l, val_r, df_data, col_l, col_r):
     if val_l is None or val_r is None: return None, None
     
     if "Knee" in col_l or "KTW" in col_l:
-         max_l = pd.to_numeric(df_data[col_l], errors='coerce').max()
-         max_r = pd.to_numeric(df_data[col_r], errors='coerce').max()
+         table = get_percentile_table(df_data)
+         max_l, max_r = table.max(col_l), table.max(col_r)
          ref = max(max_l, max_r) if (pd.notna(max_l) and pd.notna(max_r)) else 0
          if ref == 0: return 0, ""
          pct = (abs(val_l - val_r) / ref) * 100
@@ -478,18 +384,35 @@ def inject_custom_css():
         .stat-value {{ font-size: 28px; font-weight: 800; color: #FFFFFF; }}
     </style>""", unsafe_allow_html=True)
 
+@timed()
 def load_data_from_source(source):
     """Charge les données depuis un fichier (str path) ou un objet file uploadé."""
     try:
-        df = pd.read_excel(source, header=0)
-        cols_lower = {str(c).lower().strip(): c for c in df.columns}
-        target = next((cols_lower[k] for k in ['joueur', 'nom', 'name'] if k in cols_lower), None)
-        if not target: return pd.DataFrame(), "Colonne 'Joueur' introuvable dans le fichier."
-        df = df.dropna(subset=[target]).rename(columns={target: 'Joueur'})
-        df['Joueur'] = df['Joueur'].astype(str).str.title().str.strip()
+        # Les en-têtes ne sont pas strippés ici : COL_MAPPING contient des noms avec espaces finaux
+        df = load_profiling_workbook(source, strip_columns=False)
+        if df is None: return pd.DataFrame(), "Colonne 'Joueur' introuvable dans le fichier."
+        # Conversion numérique de toutes les colonnes dès le chargement
+        get_numeric_frame(df)
         return df, None
     except Exception as e: return pd.DataFrame(), str(e)
 
+def track_dataset_changes(df):
+    """
+    Compare le jeu de données courant au précédent de la session (clé = Joueur),
+    met à jour la table de percentiles en incrémental et retourne le résumé des changements.
+    """
+    version = dataset_version(df)
+    prev = st.session_state.get("profiling_prev_df")
+    if prev is not None and dataset_version(prev) != version:
+        diff = diff_datasets(prev, df)
+        update_percentile_table(prev, df, diff)
+        st.session_state["profiling_diff"] = (version, diff.summary())
+    st.session_state["profiling_prev_df"] = df
+
+    last = st.session_state.get("profiling_diff")
+    return last[1] if last and last[0] == version else None
+
+@timed()
 def load_all_data():
     """Charge le fichier par défaut si aucun upload n'est fait."""
     possible_files = ["Profilage pratiquexlsx.xlsx", "Profilage.xlsx"]
@@ -536,24 +459,58 @@ def show_profiling_page(df_main=None):
                         with open("Profilage pratiquexlsx.xlsx", "wb") as f: f.write(uploaded_file.getbuffer())
                     except: st.warning("Visualisation active.")
 
+                    # Archivage de la campagne (le fichier courant sera écrasé par la suivante)
+                    c_date, c_btn = st.columns([1, 1])
+                    with c_date:
+                        test_date = st.date_input("Date de la campagne", key="history_date")
+                        replace = st.checkbox("Remplacer les valeurs déjà archivées à cette date", key="history_replace")
+                    with c_btn:
+                        st.markdown("<br>", unsafe_allow_html=True)
+                        if st.button("Archiver dans l'historique", use_container_width=True):
+                            added, differing = get_history_store().append_dataset(
+                                df, test_date, source=uploaded_file.name, replace=replace)
+                            if added: st.success(f"{added} mesures archivées au {test_date:%d/%m/%Y}.")
+                            if differing:
+                                st.warning(f"{differing} valeur(s) diffèrent de celles archivées à cette date et n'ont "
+                                           "pas été modifiées : cocher « Remplacer » pour les écraser.")
+                            elif not added: st.info("Campagne déjà archivée à cette date.")
+
     st.markdown("---")
     if df.empty: df, err = load_all_data()
     if df.empty:
         st.info("Aucune donnée chargée.")
         return
 
+    # Nouveau fichier : seuls les joueurs et colonnes modifiés sont recalculés
+    diff_msg = track_dataset_changes(df)
+    if diff_msg: st.info(f"🔄 {diff_msg}")
+
     # --- 4. AFFICHAGE PRINCIPAL ---
     tab_indiv, tab_team = st.tabs(["PROFIL INDIVIDUEL", "ANALYSE COLLECTIVE"])
 
     with tab_indiv:
-        all_players = sorted(df['Joueur'].unique())
-        col_sel, _ = st.columns([1, 2])
+        # Index Joueur -> ligne construit une fois par jeu de données
+        dataset = get_player_dataset(df)
+        all_players = dataset.players
+        col_sel, col_cohort, _ = st.columns([1, 1, 1])
         with col_sel: p_sel = st.selectbox("Rechercher un joueur :", all_players)
+        with col_cohort:
+            cohort_by = st.selectbox(
+                "Percentiles calculés sur :", [None] + cohort_columns(df), key="percentile_cohort",
+                format_func=lambda c: "Tout l'effectif" if c is None else f"Même {str(c).strip().lower()}"
+            )
         
-        row = df[df['Joueur'] == p_sel].iloc[0]
+        row = dataset.row(p_sel)
+        # Valeurs numériques de la ligne, converties une fois par jeu de données
+        row_num = numeric_row(df, row)
+
+        # Cohorte du joueur (ex : même poste), percentiles de tout le jeu de données calculés en une passe
+        cohort = get_cohort_table(df, cohort_by).for_row(row.name) if cohort_by else None
+        if cohort is not None:
+            st.caption(f"Percentiles calculés parmi les {cohort.size} joueurs « {cohort.group} ».")
         
         poids_col_name = find_column_in_df(df, "Poids")
-        poids_joueur = clean_numeric_value(row.get(poids_col_name))
+        poids_joueur = row_num.get(poids_col_name)
         
         col_poste = find_column_in_df(df, "Poste")
         col_lat = find_column_in_df(df, "Latéralité")
@@ -565,12 +522,12 @@ def show_profiling_page(df_main=None):
         anthro_vals = {}
         for label in ["Taille", "Poids", "Masse Grasse Plis (mm)"]:
             col_name = find_column_in_df(df, label)
-            val = clean_numeric_value(row.get(col_name))
+            val = row_num.get(col_name)
             unit = " cm" if label == "Taille" else " kg" if label == "Poids" else " mm"
             anthro_vals[label] = f"{smart_format(val)}{unit}" if val else "-"
 
-        photo_path = get_best_photo_path(p_sel) 
-        img_src = f"data:image/png;base64,{img_to_b64(photo_path)}" if photo_path else ""
+        # Miniature pré-redimensionnée (110 px affichés) au lieu de l'original en base64
+        img_src = assets.player_photo_uri(p_sel, "hero")
         img_html = f'<img src="{img_src}" class="hero-photo">' if img_src else '<div class="hero-photo" style="display:flex;align-items:center;justify-content:center;background:#222;color:#555;font-size:10px;">PHOTO</div>'
         
         st.markdown(f"""
@@ -599,7 +556,6 @@ def show_profiling_page(df_main=None):
         ]
         
         # 2. Préparation des données
-        row_updated = df[df['Joueur'] == p_sel].iloc[0]
         radar_labels = []
         radar_values = []
         table_rows_data = []
@@ -615,12 +571,12 @@ def show_profiling_page(df_main=None):
             
             for col_key in item['cols']:
                 col_name = COL_MAPPING.get(col_key, col_key)
-                val = clean_numeric_value(row_updated.get(col_name))
+                val = row_num.get(col_name)
                 
                 if col_name and val is not None:
                     try:
                         # Calcul Score
-                        _, p = calculate_percentile(df, col_name, val)
+                        _, p = calculate_percentile(df, col_name, val, cohort=cohort)
                         sum_p += p
                         count += 1
                         
@@ -656,8 +612,12 @@ def show_profiling_page(df_main=None):
         c_radar, c_table = st.columns([3, 2])
         
         with c_radar:
-            radar_b64 = create_radar_chart(radar_labels, radar_values, text_color="white")
-            st.image(f"data:image/png;base64,{radar_b64}", use_container_width=True)
+            if PAGE_RADAR_BACKEND == "plotly":
+                fig_radar = create_radar_chart(radar_labels, radar_values, text_color="white", backend="plotly")
+                st.plotly_chart(fig_radar, use_container_width=True, config={'displayModeBar': False})
+            else:
+                radar_b64 = create_radar_chart(radar_labels, radar_values, text_color="white")
+                st.image(f"data:image/png;base64,{radar_b64}", use_container_width=True)
 
         with c_table:
             # --- AJOUT DU HEADER EXPLICATIF ---
@@ -742,7 +702,7 @@ def show_profiling_page(df_main=None):
             Retourne : (Valeur, Colonne_utilisée_pour_percentile, Unité, Label_Secondaire)
             """
             col_abs = get_col_name(label)
-            val_abs = clean_numeric_value(row.get(col_abs))
+            val_abs = row_num.get(col_abs)
             
             # Unités de base
             unit_abs = get_unit(label) 
@@ -750,7 +710,7 @@ def show_profiling_page(df_main=None):
             
             # Si on n'est pas en mode relatif ou si l'unité ne s'y prête pas (cm, s, deg...), on renvoie l'absolu
             if not use_rel_mode or not is_force_or_power or val_abs is None:
-                _, pct = calculate_percentile(df, col_abs, val_abs)
+                _, pct = calculate_percentile(df, col_abs, val_abs, cohort=cohort)
                 rel_txt = get_rel_display_smart(row, label, val_abs, poids_joueur)
                 return val_abs, pct, unit_abs, rel_txt, "abs"
 
@@ -776,8 +736,8 @@ def show_profiling_page(df_main=None):
 
             # 2. Si colonne trouvée -> On l'utilise
             if col_rel:
-                val_rel = clean_numeric_value(row.get(col_rel))
-                _, pct_rel = calculate_percentile(df, col_rel, val_rel)
+                val_rel = row_num.get(col_rel)
+                _, pct_rel = calculate_percentile(df, col_rel, val_rel, cohort=cohort)
                 unit_rel = "N/kg" if "N" in unit_abs else "W/kg" if "W" in unit_abs else "ratio"
                 sub_txt = f"{smart_format(val_abs)} {unit_abs}" # L'absolu devient le secondaire
                 return val_rel, pct_rel, unit_rel, sub_txt, "rel"
@@ -798,12 +758,14 @@ def show_profiling_page(df_main=None):
                 if col_poids_name:
                     # Calcul vectoriel pour le classement
                     try:
-                        # On évite la division par zéro
-                        serie_rel = df[col_abs] / df[col_poids_name].replace(0, np.nan)
+                        # Valeurs déjà converties ("30,5" -> 30.5) ; on évite la division par zéro
+                        values = get_numeric_frame(df).values
+                        serie_rel = values[col_abs] / values[col_poids_name].replace(0, np.nan)
                         # Calcul du percentile sur cette série calculée
                         if pd.isna(val_rel): pct_rel = 0
                         else:
                             import scipy.stats as stats
+                            if cohort is not None: serie_rel = serie_rel.loc[cohort.members]
                             clean_series = serie_rel.dropna()
                             pct_rel = stats.percentileofscore(clean_series, val_rel, kind='weak')
                         
@@ -813,10 +775,11 @@ def show_profiling_page(df_main=None):
                         pass # Echec calcul vectoriel
 
             # Si tout échoue, retour à l'absolu
-            _, pct = calculate_percentile(df, col_abs, val_abs)
+            _, pct = calculate_percentile(df, col_abs, val_abs, cohort=cohort)
             return val_abs, pct, unit_abs, None, "abs"
 
 
+        @timed("carte_kpi")
         def render_single_kpi(label, subtitle=None):
             # Récupération dynamique
             val, pct, unit, sub_text, mode = get_data_smart(label, use_relative)
@@ -831,7 +794,7 @@ def show_profiling_page(df_main=None):
             # Couleur du texte : On garde la logique "Norme Absolue" pour savoir si c'est vert/rouge
             # car c'est souvent là que sont définis les seuils.
             col_abs_name = get_col_name(label)
-            val_abs_ref = clean_numeric_value(row.get(col_abs_name))
+            val_abs_ref = row_num.get(col_abs_name)
             status_res = get_status_data_local(label, val_abs_ref)
             if len(status_res) == 3: color, _, txt_col = status_res
             else: color, txt_col = status_res[0], "#FFF"
@@ -877,6 +840,7 @@ def show_profiling_page(df_main=None):
 </div>
 </div>""", unsafe_allow_html=True)
 
+        @timed("carte_kpi_paire")
         def render_pair_kpi(l_label, r_label):
             # Récupération Gauche
             val_l, pct_l, unit_l, sub_l, mode_l = get_data_smart(l_label, use_relative)
@@ -884,14 +848,14 @@ def show_profiling_page(df_main=None):
             val_r, pct_r, unit_r, sub_r, mode_r = get_data_smart(r_label, use_relative)
             
             # Couleurs texte
-            st_l = get_status_data_local(l_label, clean_numeric_value(row.get(get_col_name(l_label))))
+            st_l = get_status_data_local(l_label, row_num.get(get_col_name(l_label)))
             txt_l = st_l[2] if len(st_l) == 3 else "#FFF"
-            st_r = get_status_data_local(r_label, clean_numeric_value(row.get(get_col_name(r_label))))
+            st_r = get_status_data_local(r_label, row_num.get(get_col_name(r_label)))
             txt_r = st_r[2] if len(st_r) == 3 else "#FFF"
             
             # Calcul Asymétrie (Toujours sur l'absolu)
             col_l_abs, col_r_abs = get_col_name(l_label), get_col_name(r_label)
-            val_l_abs, val_r_abs = clean_numeric_value(row.get(col_l_abs)), clean_numeric_value(row.get(col_r_abs))
+            val_l_abs, val_r_abs = row_num.get(col_l_abs), row_num.get(col_r_abs)
             asym_pct, weak_side = get_asym_badge_info(val_l_abs, val_r_abs, df, col_l_abs, col_r_abs)
             
             # --- LOGIQUE 3 COULEURS ---
@@ -945,6 +909,7 @@ Déficit {weak_side} ({asym_pct:.0f}%)
 </div>
 </div>""", unsafe_allow_html=True)
 
+        @timed("carte_groupe_musculaire")
         def render_muscle_group_card(title_main, l_label, r_label, sum_label):
             # Récupération intelligente
             val_l, pct_l, unit_l, sub_l, _ = get_data_smart(l_label, use_relative)
@@ -952,14 +917,14 @@ Déficit {weak_side} ({asym_pct:.0f}%)
             val_s, pct_s, unit_s, sub_s, _ = get_data_smart(sum_label, use_relative)
 
             # Couleurs (Absolu)
-            txt_l = get_status_data_local(l_label, clean_numeric_value(row.get(get_col_name(l_label))))[2] if len(get_status_data_local(l_label, 0))==3 else "#FFF"
-            txt_r = get_status_data_local(r_label, clean_numeric_value(row.get(get_col_name(r_label))))[2] if len(get_status_data_local(r_label, 0))==3 else "#FFF"
-            txt_s = get_status_data_local(sum_label, clean_numeric_value(row.get(get_col_name(sum_label))))[2] if len(get_status_data_local(sum_label, 0))==3 else "#FFF"
+            txt_l = get_status_data_local(l_label, row_num.get(get_col_name(l_label)))[2] if len(get_status_data_local(l_label, 0))==3 else "#FFF"
+            txt_r = get_status_data_local(r_label, row_num.get(get_col_name(r_label)))[2] if len(get_status_data_local(r_label, 0))==3 else "#FFF"
+            txt_s = get_status_data_local(sum_label, row_num.get(get_col_name(sum_label)))[2] if len(get_status_data_local(sum_label, 0))==3 else "#FFF"
             
             norm_s = get_norm_text(sum_label).replace('Obj: ', '')
             
             # Asymétrie (Absolu)
-            asym_pct, weak_side = get_asym_badge_info(clean_numeric_value(row.get(get_col_name(l_label))), clean_numeric_value(row.get(get_col_name(r_label))), df, get_col_name(l_label), get_col_name(r_label))
+            asym_pct, weak_side = get_asym_badge_info(row_num.get(get_col_name(l_label)), row_num.get(get_col_name(r_label)), df, get_col_name(l_label), get_col_name(r_label))
             
             # --- LOGIQUE 3 COULEURS ---
             asym_html = ""
@@ -1024,12 +989,12 @@ Déficit {weak_side} ({asym_pct:.0f}%)
 </div>""", unsafe_allow_html=True)
         def render_wellness_combined():
             # Pas de relatif pour le wellness
-            val_s = clean_numeric_value(row.get("Score Sommeil"))
-            _, pct_s = calculate_percentile(df, "Score Sommeil", val_s)
+            val_s = row_num.get("Score Sommeil")
+            _, pct_s = calculate_percentile(df, "Score Sommeil", val_s, cohort=cohort)
             col_s = get_bar_color(pct_s)
             
-            val_n = clean_numeric_value(row.get("Score Nutrition"))
-            _, pct_n = calculate_percentile(df, "Score Nutrition", val_n)
+            val_n = row_num.get("Score Nutrition")
+            _, pct_n = calculate_percentile(df, "Score Nutrition", val_n, cohort=cohort)
             col_n = get_bar_color(pct_n)
 
             st.markdown(f"""
@@ -1157,8 +1122,8 @@ Déficit {weak_side} ({asym_pct:.0f}%)
             real_col_g_rel = find_column_in_df(df, col_g_rel) or col_g_rel
             real_col_d_rel = find_column_in_df(df, col_d_rel) or col_d_rel
 
-            v_g_rel = clean_numeric_value(row.get(real_col_g_rel))
-            v_d_rel = clean_numeric_value(row.get(real_col_d_rel))
+            v_g_rel = row_num.get(real_col_g_rel)
+            v_d_rel = row_num.get(real_col_d_rel)
             
             vals_l_rel.append(v_g_rel if v_g_rel is not None else 0)
             vals_r_rel.append(v_d_rel if v_d_rel is not None else 0)
@@ -1170,8 +1135,8 @@ Déficit {weak_side} ({asym_pct:.0f}%)
             real_col_g_raw = find_column_in_df(df, col_g_raw) or col_g_raw
             real_col_d_raw = find_column_in_df(df, col_d_raw) or col_d_raw
             
-            v_g_raw = clean_numeric_value(row.get(real_col_g_raw))
-            v_d_raw = clean_numeric_value(row.get(real_col_d_raw))
+            v_g_raw = row_num.get(real_col_g_raw)
+            v_d_raw = row_num.get(real_col_d_raw)
 
             # Calcul LSI sur le brut
             s_lsi = "-"
@@ -1302,8 +1267,8 @@ Déficit {weak_side} ({asym_pct:.0f}%)
             col_g_raw, col_d_raw = item["g_raw"], item["d_raw"]
             real_col_g_raw = find_column_in_df(df, col_g_raw) or col_g_raw
             real_col_d_raw = find_column_in_df(df, col_d_raw) or col_d_raw
-            v_g_raw = clean_numeric_value(row.get(real_col_g_raw))
-            v_d_raw = clean_numeric_value(row.get(real_col_d_raw))
+            v_g_raw = row_num.get(real_col_g_raw)
+            v_d_raw = row_num.get(real_col_d_raw)
 
             # Calcul LSI et COULEURS
             s_lsi = "-"
@@ -1329,8 +1294,8 @@ Déficit {weak_side} ({asym_pct:.0f}%)
         col_rm_g = find_column_in_df(df, "Ratio Mixte G") or "Ratio Mixte G"
         col_rm_d = find_column_in_df(df, "Ratio Mixte D") or "Ratio Mixte D"
         
-        val_rm_g = clean_numeric_value(row.get(col_rm_g))
-        val_rm_d = clean_numeric_value(row.get(col_rm_d))
+        val_rm_g = row_num.get(col_rm_g)
+        val_rm_d = row_num.get(col_rm_d)
 
         def get_ratio_color(val):
             if val is None: return "#888"
@@ -1473,6 +1438,27 @@ Déficit {weak_side} ({asym_pct:.0f}%)
                     else:
                         render_single_kpi(item["label"])
 
+        # --- PROGRESSION (HISTORIQUE MULTI-SAISONS) ---
+        if history_available():
+            store = get_history_store()
+            tracked = store.player_metrics(p_sel, min_points=2)
+            if tracked:
+                with st.expander("📈 PROGRESSION (HISTORIQUE DES TESTS)", expanded=False):
+                    metric = st.selectbox("Indicateur :", sorted(tracked), key=f"hist_metric_{p_sel}")
+                    hist = store.history(p_sel, metric)
+
+                    import plotly.graph_objects as go
+                    fig = go.Figure(go.Scatter(x=hist["date"], y=hist["valeur"], mode="lines+markers",
+                                               line=dict(color=SDR_RED, width=2), marker=dict(size=8)))
+                    fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+                                      font=dict(color="white"), height=300, margin=dict(l=40, r=20, t=20, b=40),
+                                      yaxis_title=get_unit(metric))
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    first, last = hist["valeur"].iloc[0], hist["valeur"].iloc[-1]
+                    evol = (last - first) / abs(first) * 100 if first else 0
+                    st.caption(f"{len(hist)} mesures · {smart_format(first)} → {smart_format(last)} ({evol:+.1f} %)")
+
         st.markdown("---")
         
         key_dom, key_weak, key_strat, key_ante = f"str_dom_{p_sel}", f"str_weak_{p_sel}", f"str_strat_{p_sel}", f"str_ante_{p_sel}"
@@ -1514,6 +1500,7 @@ Déficit {weak_side} ({asym_pct:.0f}%)
             st.dataframe(pd.DataFrame(data_norms), use_container_width=True, hide_index=True)
 
         with tab_team:
+            from team_profiling import show_team_page
             show_team_page(df, OFFICIAL_STRUCTURE)
 
         
@@ -1537,24 +1524,62 @@ Déficit {weak_side} ({asym_pct:.0f}%)
         safe_weak = st.session_state.get(key_weak, "")
         safe_strat = st.session_state.get(key_strat, "")
 
-        # 2. Génération immédiate du rapport (sans condition if st.button)
-        html_rep = generate_report(
-            p_sel, row, df, 
-            val_poste, val_lat, val_num, 
-            safe_dom, safe_weak, safe_strat, 
-            anthro_vals
-        )
-        
-        # 3. Encodage en Base64
-        b64 = base64.b64encode(html_rep.encode()).decode()
-        
-        # 4. Affichage du bouton HTML personnalisé (Votre style)
-        download_btn = f'''
-        <a href="data:text/html;base64,{b64}" download="Profilage_{p_sel}.html" style="text-decoration:none;">
-            <button style="background-color:{SDR_RED}; color:white; padding:12px 20px; border:none; border-radius:5px; font-weight:bold; cursor:pointer; width:100%;">
-                TÉLÉCHARGER LE RAPPORT PDF
-            </button>
-        </a>
-        '''
-        
-        st.markdown(download_btn, unsafe_allow_html=True)
+        # 2. Rapport généré au clic seulement (puis mémorisé par joueur, jeu de données et notes).
+        # Le callable s'exécute après le rerun : en mode admin, il est chronométré dans son propre run (journal JSON).
+        perf_enabled = current_run() is not None
+
+        def build_report():
+            return get_report(
+                p_sel, row, df,
+                val_poste, val_lat, val_num,
+                safe_dom, safe_weak, safe_strat,
+                anthro_vals,
+                radar_backend=REPORT_RADAR_BACKEND, cohort_by=cohort_by
+            )
+
+        def build_html():
+            with deferred_run(f"rapport:{p_sel}", perf_enabled):
+                return build_report()
+
+        def build_pdf():
+            with deferred_run(f"rapport:{p_sel}", perf_enabled):
+                html = build_report()
+                with timer("html_to_pdf"):
+                    return html_to_pdf(html)
+
+        # 3. Bouton de téléchargement (aucun rerun au clic) : PDF rendu sur le serveur si possible
+        report_pdf = pdf_available()
+        if report_pdf:
+            st.download_button(
+                "TÉLÉCHARGER LE RAPPORT PDF", data=build_pdf,
+                file_name=f"Profilage_{p_sel}.pdf", mime="application/pdf",
+                type="primary", on_click="ignore", use_container_width=True
+            )
+        else:
+            st.download_button(
+                "TÉLÉCHARGER LE RAPPORT (HTML)", data=build_html,
+                file_name=f"Profilage_{p_sel}.html", mime="text/html",
+                type="primary", on_click="ignore", use_container_width=True,
+                help="Export PDF indisponible (WeasyPrint non installé) : imprimer le fichier en PDF depuis le navigateur."
+            )
+            st.caption("Export PDF indisponible sur ce serveur : WeasyPrint ou les bibliothèques système "
+                       "Pango (libpango-1.0-0, libpangoft2-1.0-0) sont absents.")
+
+        # 4. Rapports de tout l'effectif (génération parallèle, archive zip)
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("GÉNÉRER LES RAPPORTS DE TOUT L'EFFECTIF (ZIP)", use_container_width=True):
+            all_notes = {
+                p: (st.session_state.get(f"str_dom_{p}", ""), st.session_state.get(f"str_weak_{p}", ""), st.session_state.get(f"str_strat_{p}", ""))
+                for p in all_players
+            }
+            from batch_reports import generate_all_reports # multiprocessing chargé seulement ici
+            progress_bar = st.progress(0.0, text="Génération des rapports...")
+            zip_bytes, skipped = generate_all_reports(
+                df, notes=all_notes, radar_backend=REPORT_RADAR_BACKEND, fmt="pdf" if report_pdf else "html",
+                cohort_by=cohort_by,
+                progress=lambda i, n: progress_bar.progress(i / n, text=f"{i}/{n} rapports")
+            )
+            if skipped:
+                st.warning(f"⚠️ {len(skipped)} rapport(s) non générés : "
+                           + ", ".join(f"{p} ({err})" for p, err in skipped))
+            st.download_button("TÉLÉCHARGER L'ARCHIVE", zip_bytes, "Rapports_Profilage.zip", "application/zip", use_container_width=True)
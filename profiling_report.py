@@ -1,13 +1,11 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import base64
-import os
-import re
+import json
+import hashlib
 import unicodedata
 from io import BytesIO
 from math import pi
-from scipy import stats
 
 # --- IMPORT DES CONFIGURATIONS EXISTANTES ---
 from config_rapport import (
@@ -18,61 +16,41 @@ from config_rapport import (
     SDR_RED, 
     RELATIVE_NORM_KEYS
 )
+from column_resolver import get_column_resolver
+from percentiles import get_percentile_table, get_cohort_table
+from chart_cache import cached_chart
+from radar_render import radar_svg
+from derived_metrics import BILATERAL_MEANS, bilateral_mean_value, get_derived_metrics
+import assets
+from numeric import numeric_row, clean_numeric_value
+from perf import timed
+from data_cache import dataset_version
+from lru import LRUCache
 
 # =============================================================================
 # 1. FONCTIONS UTILITAIRES (INTERNES AU RAPPORT)
 # =============================================================================
 
-def clean_numeric_value(val):
-    if pd.isna(val) or val == "" or val == "-": return None
-    try:
-        if isinstance(val, (int, float)): return float(val)
-        val_str = str(val).replace(',', '.')
-        match = re.search(r"[-+]?\d*\.\d+|\d+", val_str)
-        if match: return float(match.group())
-        return None
-    except: return None
-
 def remove_accents(input_str):
     if not isinstance(input_str, str): return str(input_str)
     nfkd_form = unicodedata.normalize('NFKD', input_str)
     return "".join([c for c in nfkd_form if not unicodedata.combining(c)])
 
 def find_column_in_df(df, label):
-    # Mapping inversé simplifié pour la recherche
-    col_map_lower = {k.lower(): v for k, v in COL_MAPPING.items()}
-    label_lower = label.lower()
-    
-    # 1. Essai direct via mapping
-    if label_lower in col_map_lower:
-        mapped = col_map_lower[label_lower]
-        if mapped in df.columns: return mapped
-        
-    # 2. Recherche par mot clé approximatif
-    df_cols_clean = [remove_accents(str(c)).lower().strip() for c in df.columns]
-    label_clean = remove_accents(label).lower().strip().replace("(g)", "").replace("(d)", "")
-    
-    for idx, col in enumerate(df_cols_clean):
-        if label_clean in col:
-            return df.columns[idx]
-    return None
+    # Mapping direct puis mots-clés, via l'index partagé par schéma
+    return get_column_resolver(df).find(label)
 
 def is_inverted(label):
     keywords = ['temps', 'chrono', '10m', '505', 'agilité', 'masse grasse', 'landing %']
     return any(x in str(label).lower() for x in keywords)
 
-def calculate_percentile(df, col_name, value):
-    if col_name not in df.columns or pd.isna(value): return 0, 0
-    valid_values = pd.to_numeric(df[col_name], errors='coerce').dropna()
-    if valid_values.empty: return 0, 0
-    mean_val = valid_values.mean()
-    inverted = is_inverted(col_name)
-    
-    if inverted:
-        percentile = (valid_values >= value).mean() * 100
-    else:
-        percentile = (valid_values <= value).mean() * 100
-    return mean_val, percentile
+@timed()
+def calculate_percentile(df, col_name, value, cohort=None):
+    # Cohorte (ex : même poste) : rang pré-calculé par groupe ; sinon tout l'effectif
+    if cohort is not None:
+        res = cohort.percentile(col_name, value, inverted=is_inverted(col_name))
+        if res is not None: return res
+    return get_percentile_table(df).percentile(col_name, value, inverted=is_inverted(col_name))
 
 def get_report_color(label, val):
     if val is None: return "#888"
@@ -95,28 +73,22 @@ def get_report_color(label, val):
 # =============================================================================
 
 def img_to_b64(img_path):
-    try:
-        with open(img_path, "rb") as f: return base64.b64encode(f.read()).decode()
-    except: return ""
+    return assets.get_asset_b64(img_path)
 
 def get_best_photo_path(player_name):
-    folder = "Photos"
-    if not os.path.exists(folder): return None
-    files = [f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f))]
-    clean_p = remove_accents(player_name).lower().strip()
-    
-    for f in files:
-        if clean_p in remove_accents(f).lower():
-            return os.path.join(folder, f)
-    return None
+    return assets.get_best_photo_path(player_name)
 
-def create_radar_chart(categories, values, text_color="black"):
+@timed("radar_rapport")
+@cached_chart
+def create_radar_chart(categories, values, text_color="black", backend="png"):
     if not categories: return ""
+    if backend == "svg": return radar_svg(categories, values, text_color=text_color)
     N = len(categories)
     values_closed = values + values[:1]
     angles = [n / float(N) * 2 * pi for n in range(N)]
     angles += angles[:1]
     
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
     
     # Fond
@@ -151,20 +123,23 @@ def create_radar_chart(categories, values, text_color="black"):
 # 3. FONCTION PRINCIPALE : GENERATE REPORT
 # =============================================================================
 
-def generate_report(player_name, df_row, df, poste, laterality, number, dominant_point, weak_point, strat_point, anthro_data):
+@timed()
+def generate_report(player_name, df_row, df, poste, laterality, number, dominant_point, weak_point, strat_point, anthro_data, radar_backend="png", cohort_by=None):
     
     # --- A. PRÉPARATION DES DONNÉES ---
+    row_num = numeric_row(df, df_row) # valeurs déjà converties (une fois par jeu de données)
+    # cohort_by (ex : colonne Poste) : percentiles calculés parmi les joueurs du même groupe
+    cohort = get_cohort_table(df, cohort_by).for_row(df_row.name) if cohort_by else None
     
     # 1. Calcul du Top/Flop 3
     all_scores = []
     for cat, vars in OFFICIAL_STRUCTURE.items():
         for label in vars:
-            col_name = COL_MAPPING.get(label, label)
-            if col_name not in df.columns: col_name = find_column_in_df(df, label)
+            col_name = find_column_in_df(df, label)
             
-            val = clean_numeric_value(df_row.get(col_name))
+            val = row_num.get(col_name)
             if col_name and val is not None:
-                mean_val, p = calculate_percentile(df, col_name, val)
+                mean_val, p = calculate_percentile(df, col_name, val, cohort=cohort)
                 all_scores.append({"label": label, "percentile": p, "val": val, "mean": mean_val})
     
     all_scores.sort(key=lambda x: x["percentile"], reverse=True)
@@ -181,15 +156,10 @@ def generate_report(player_name, df_row, df, poste, laterality, number, dominant
         {"label": "Explosivité", "cols": ["CMJ (cm)"], "unit": ["cm"]}
     ]
     
-    # Pré-calcul des moyennes (G+D) pour le radar
-    ng, nd = COL_MAPPING.get("Nordic Ischio (G)"), COL_MAPPING.get("Nordic Ischio (D)")
-    if ng in df.columns and nd in df.columns: df['Nordic Mean'] = df[[ng, nd]].mean(axis=1)
-    
-    ag, ad = COL_MAPPING.get("Adducteurs (G)"), COL_MAPPING.get("Adducteurs (D)")
-    if ag in df.columns and ad in df.columns: df['Adducteurs Mean'] = df[[ag, ad]].mean(axis=1)
-    
-    kg, kd = COL_MAPPING.get("Knee To Wall (G)"), COL_MAPPING.get("Knee To Wall (D)")
-    if kg in df.columns and kd in df.columns: df['Calculated_KTW_Mean'] = df[[kg, kd]].mean(axis=1)
+    # Moyennes (G+D) pour le radar : calculées à part, df n'est pas modifié
+    derived = get_derived_metrics(df)
+    derived_cohort = (get_cohort_table(derived, cohort_by, groups=df[cohort_by]).for_row(df_row.name)
+                      if cohort is not None else None)
 
     radar_labels, radar_values, details_html = [], [], ""
     
@@ -198,22 +168,18 @@ def generate_report(player_name, df_row, df, poste, laterality, number, dominant
         sum_p, count, sub_details = 0, 0, []
         
         for idx, col_key in enumerate(item['cols']):
-            # Gestion des moyennes calculées
-            if "Mean" in col_key:
-                if col_key == "Nordic Mean": 
-                    val = (clean_numeric_value(df_row.get(ng)) + clean_numeric_value(df_row.get(nd))) / 2
-                elif col_key == "Adducteurs Mean": 
-                    val = (clean_numeric_value(df_row.get(ag)) + clean_numeric_value(df_row.get(ad))) / 2
-                elif col_key == "Calculated_KTW_Mean": 
-                    val = (clean_numeric_value(df_row.get(kg)) + clean_numeric_value(df_row.get(kd))) / 2
-                col_name = col_key
+            # Gestion des moyennes calculées (percentile sur le DataFrame dérivé)
+            if col_key in BILATERAL_MEANS:
+                val = bilateral_mean_value(df, df_row, col_key)
+                col_name, ref_df, ref_cohort = col_key, derived, derived_cohort
             else:
                 col_name = COL_MAPPING.get(col_key, find_column_in_df(df, col_key))
-                val = clean_numeric_value(df_row.get(col_name))
+                val = row_num.get(col_name)
+                ref_df, ref_cohort = df, cohort
             
             if val is not None:
                 try:
-                    _, p = calculate_percentile(df, col_name, val)
+                    _, p = calculate_percentile(ref_df, col_name, val, cohort=ref_cohort)
                     sum_p += p
                     count += 1
                 except: pass
@@ -235,24 +201,27 @@ def generate_report(player_name, df_row, df, poste, laterality, number, dominant
         c_style = "color:#27ae60" if final_score > 66 else ("color:#F39C12" if final_score > 33 else "color:#D71920")
         details_html += f"""<div style="border-bottom:1px solid #eee; padding:3px 0;"><div style="display:flex; justify-content:space-between;"><span style="font-weight:bold; font-size:9pt; color:#333;">{item['label']}</span><span style="{c_style}; font-weight:bold; font-size:8pt;">P{int(final_score)}</span></div><div style="font-size:7pt; color:#888;">{" • ".join(sub_details)}</div></div>"""
 
-    radar_b64 = create_radar_chart(radar_labels, radar_values, text_color="black")
+    # 'svg' : radar vectoriel inline (quelques Ko), 'png' : image matplotlib en base64
+    if radar_backend == "svg":
+        radar_html = create_radar_chart(radar_labels, radar_values, text_color="black", backend="svg")
+    else:
+        radar_b64 = create_radar_chart(radar_labels, radar_values, text_color="black")
+        radar_html = f'<img src="data:image/png;base64,{radar_b64}" style="width:100%;">'
 
     # 3. Calcul Asymétries (Force / Mobilité)
     def calc_asym_avg(pairs):
         t, c = 0, 0
         for g, d in pairs:
-            cg, cd = COL_MAPPING.get(g, g), COL_MAPPING.get(d, d)
-            if cg not in df.columns: cg = find_column_in_df(df, g)
-            if cd not in df.columns: cd = find_column_in_df(df, d)
+            cg, cd = find_column_in_df(df, g), find_column_in_df(df, d)
             
-            vg = clean_numeric_value(df_row.get(cg))
-            vd = clean_numeric_value(df_row.get(cd))
+            vg = row_num.get(cg)
+            vd = row_num.get(cd)
             
             if vg is not None and vd is not None:
                 # KTW: % par rapport au max équipe (pour éviter les écarts énormes sur petites valeurs)
                 if "Knee" in g or "KTW" in g:
-                    max_l = pd.to_numeric(df[cg], errors='coerce').max()
-                    max_r = pd.to_numeric(df[cd], errors='coerce').max()
+                    max_l = get_percentile_table(df).max(cg)
+                    max_r = get_percentile_table(df).max(cd)
                     ref = max(max_l, max_r) if (pd.notna(max_l) and pd.notna(max_r)) else 15
                     if ref > 0:
                         t += (vd - vg) / ref * 100
@@ -286,12 +255,11 @@ def generate_report(player_name, df_row, df, poste, laterality, number, dominant
     # --- B. CONSTRUCTION DU HTML ---
     
     # Images
-    photo_b64 = img_to_b64(get_best_photo_path(player_name))
-    photo_html = f'<img src="data:image/png;base64,{photo_b64}" style="width:200px; height:200px; object-fit:contain; border-radius:8px;">' if photo_b64 else ""
+    photo_src = assets.player_photo_uri(player_name, "report")
+    photo_html = f'<img src="{photo_src}" style="width:200px; height:200px; object-fit:contain; border-radius:8px;">' if photo_src else ""
     
     # Logo (Assure-toi que logo_sdr.png est dans le dossier ou change le nom ici)
-    logo_b64 = img_to_b64("logo_sdr.png")
-    if not logo_b64: logo_b64 = img_to_b64("logo.png") # Fallback
+    logo_b64 = assets.logo_b64() # logo_sdr.png, sinon logo.png (encodé une seule fois)
     logo_html = f'<img src="data:image/png;base64,{logo_b64}" width="100">'
 
     # CSS Global
@@ -330,6 +298,10 @@ def generate_report(player_name, df_row, df, poste, laterality, number, dominant
     """
 
     # --- HTML PAGE 1 ---
+
+    # Âge vide ou texte dans le classeur : "-" plutôt qu'une erreur
+    age = clean_numeric_value(df_row.get('Age'))
+    age_txt = "-" if age is None else int(age)
     
     summary_rows = ""
     for x in top_3:
@@ -346,7 +318,7 @@ def generate_report(player_name, df_row, df, poste, laterality, number, dominant
                 <h1 style="margin:0; color:{SDR_RED}; font-size:28pt; text-transform:uppercase;">{player_name}</h1>
                 <div style="font-size:25pt; font-weight:bold; color:{SDR_RED}; margin:5px 0;">#{number}</div>
                 <div style="font-size:17pt; font-weight:bold; text-transform:uppercase; color:#333;">{poste} | {laterality}</div>
-                <div style="font-size:15pt; color:#666; margin-top:5px;">{int(df_row.get('Age', 0))} ans | {anthro_data.get('Taille','-')} | {anthro_data.get('Poids','-')}</div>
+                <div style="font-size:15pt; color:#666; margin-top:5px;">{age_txt} ans | {anthro_data.get('Taille','-')} | {anthro_data.get('Poids','-')}</div>
             </div>
             <div style="text-align:right;">
                 {logo_html}
@@ -359,7 +331,7 @@ def generate_report(player_name, df_row, df, poste, laterality, number, dominant
         <div style="margin-bottom:15px;">
             <div class="section-title">PROFIL ATHLÉTIQUE</div>
             <div style="display:flex; align-items:center; gap:20px;">
-                <div style="width:55%;"><img src="data:image/png;base64,{radar_b64}" style="width:100%;"></div>
+                <div style="width:55%;">{radar_html}</div>
                 <div style="width:45%; background:#fff; padding:8px; border-radius:8px; border:1px solid #eee;">
                    {details_html}
                 </div>
@@ -390,18 +362,17 @@ def generate_report(player_name, df_row, df, poste, laterality, number, dominant
     details_content = ""
     for cat_name, variables in OFFICIAL_STRUCTURE.items():
         # Vérif si données dispos
-        if not any((COL_MAPPING.get(v, v) in df.columns) or (find_column_in_df(df, v)) for v in variables):
+        if not any(find_column_in_df(df, v) for v in variables):
             continue
 
         rows = ""
         for label in variables:
-            col_name = COL_MAPPING.get(label, label)
-            if col_name not in df.columns: col_name = find_column_in_df(df, label)
+            col_name = find_column_in_df(df, label)
             
-            val = clean_numeric_value(df_row.get(col_name))
+            val = row_num.get(col_name)
             if pd.isna(val) or val is None: continue
             
-            _, percentile = calculate_percentile(df, col_name, val)
+            _, percentile = calculate_percentile(df, col_name, val, cohort=cohort)
             text_color = get_report_color(label, val)
             bar_color = "#D71920" if percentile < 33 else "#F39C12" if percentile < 66 else "#27AE60"
             unit = UNITS.get(label.replace("(G)", "").replace("(D)", "").strip(), "")
@@ -441,20 +412,18 @@ def generate_report(player_name, df_row, df, poste, laterality, number, dominant
     ]
     
     for l_g, l_d, name in detail_pairs:
-        c_g = COL_MAPPING.get(l_g, l_g)
-        if c_g not in df.columns: c_g = find_column_in_df(df, l_g)
-        c_d = COL_MAPPING.get(l_d, l_d)
-        if c_d not in df.columns: c_d = find_column_in_df(df, l_d)
+        c_g = find_column_in_df(df, l_g)
+        c_d = find_column_in_df(df, l_d)
         
-        v_g = clean_numeric_value(df_row.get(c_g))
-        v_d = clean_numeric_value(df_row.get(c_d))
+        v_g = row_num.get(c_g)
+        v_d = row_num.get(c_d)
         
         if v_g is not None and v_d is not None:
             # Calcul différence relative au max
             ref = max(v_g, v_d)
             if "Knee" in name: # Ref équipe pour KTW
-                max_l = pd.to_numeric(df[c_g], errors='coerce').max()
-                max_r = pd.to_numeric(df[c_d], errors='coerce').max()
+                max_l = get_percentile_table(df).max(c_g)
+                max_r = get_percentile_table(df).max(c_d)
                 ref = max(max_l, max_r) if pd.notna(max_l) else 15
 
             pct = abs(v_g - v_d) / ref * 100 if ref > 0 else 0
@@ -522,4 +491,24 @@ def generate_report(player_name, df_row, df, poste, laterality, number, dominant
     """
 
     full_html = f"<!DOCTYPE html><html><head><meta charset='utf-8'>{css}</head><body>{page_1}{page_2}{page_3}</body></html>"
-    return full_html
\ No newline at end of file
+    return full_html
+
+# =============================================================================
+# 4. CACHE DES RAPPORTS (GÉNÉRATION À LA DEMANDE)
+# =============================================================================
+# Un rapport ne dépend que du joueur, du jeu de données (en-tête compris) et des
+# notes saisies : tant qu'aucun des trois ne change, le HTML déjà généré est réutilisé.
+
+_REPORTS = LRUCache(max_items=16)
+
+def report_cache_key(player_name, df, notes, radar_backend="png", cohort_by=None):
+    """Clé du rapport : (joueur, version du jeu de données, hash des notes, rendu du radar, cohorte)."""
+    notes_hash = hashlib.sha256(json.dumps(list(notes), ensure_ascii=False).encode("utf-8")).hexdigest()
+    return (str(player_name), dataset_version(df), notes_hash, radar_backend, cohort_by)
+
+def get_report(player_name, df_row, df, poste, laterality, number, dominant_point, weak_point, strat_point, anthro_data, radar_backend="png", cohort_by=None):
+    """generate_report avec mémorisation (mêmes arguments, HTML identique)."""
+    key = report_cache_key(player_name, df, (dominant_point, weak_point, strat_point), radar_backend, cohort_by)
+    return _REPORTS.get_or_create(key, lambda: generate_report(
+        player_name, df_row, df, poste, laterality, number,
+        dominant_point, weak_point, strat_point, anthro_data, radar_backend=radar_backend, cohort_by=cohort_by))
\ No newline at end of file
@@ -0,0 +1,204 @@
+from math import pi, cos, sin
+from html import escape
+
+from config_rapport import SDR_RED
+
+# =============================================================================
+# RENDU VECTORIEL DES RADARS (SVG / PLOTLY)
+# =============================================================================
+# Alternative légère au PNG matplotlib : mêmes zones (0-33 rouge, 66-100 vert),
+# mêmes couleurs, mais un SVG de quelques Ko au lieu d'une image base64.
+
+ZONE_LOW = ("#D71920", 0.15)
+ZONE_HIGH = ("#27AE60", 0.15)
+
+# Géométrie du SVG (viewBox élargie pour laisser la place aux libellés latéraux)
+SVG_WIDTH = 640
+SVG_HEIGHT = 500
+SVG_RADIUS = 170
+CX, CY = SVG_WIDTH / 2, SVG_HEIGHT / 2
+
+
+def _angles(n):
+    # Même convention que matplotlib en polaire : 0 à l'est, sens trigonométrique
+    return [i / float(n) * 2 * pi for i in range(n)]
+
+def _point(angle, r, r_max, clamp=True):
+    if clamp: r = max(0.0, min(r, r_max))
+    radius = SVG_RADIUS * (r / r_max if r_max else 0)
+    return CX + radius * cos(angle), CY - radius * sin(angle)
+
+def _ring_path(r_in, r_out, r_max):
+    """Anneau (ou disque si r_in = 0) via deux cercles et la règle evenodd."""
+    def circle(r):
+        rad = SVG_RADIUS * r / r_max
+        return f"M {CX - rad:.1f} {CY:.1f} a {rad:.1f} {rad:.1f} 0 1 0 {2 * rad:.1f} 0 a {rad:.1f} {rad:.1f} 0 1 0 {-2 * rad:.1f} 0 Z"
+    d = circle(r_out)
+    if r_in > 0: d += " " + circle(r_in)
+    return d
+
+def _anchor(angle):
+    x = cos(angle)
+    if x > 0.1: return "start"
+    if x < -0.1: return "end"
+    return "middle"
+
+def _svg_frame(categories, r_max, ticks, tick_labels, text_color, grid_color, grid_opacity, zones, label_size):
+    angles = _angles(len(categories))
+    parts = []
+
+    if zones:
+        parts.append(f'<path d="{_ring_path(0, 33, r_max)}" fill="{ZONE_LOW[0]}" fill-opacity="{ZONE_LOW[1]}"/>')
+        parts.append(f'<path d="{_ring_path(66, 100, r_max)}" fill="{ZONE_HIGH[0]}" fill-opacity="{ZONE_HIGH[1]}" fill-rule="evenodd"/>')
+
+    # Grille circulaire (pointillés) et rayons
+    for t in ticks:
+        rad = SVG_RADIUS * t / r_max
+        parts.append(f'<circle cx="{CX}" cy="{CY}" r="{rad:.1f}" fill="none" stroke="{grid_color}" stroke-opacity="{grid_opacity}" stroke-dasharray="4 3"/>')
+    for a in angles:
+        x, y = _point(a, r_max, r_max)
+        parts.append(f'<line x1="{CX}" y1="{CY}" x2="{x:.1f}" y2="{y:.1f}" stroke="{grid_color}" stroke-opacity="{grid_opacity}"/>')
+
+    # Libellés radiaux (sur l'axe 0°)
+    for t, lbl in zip(ticks, tick_labels):
+        if not lbl: continue
+        x, y = _point(0, t, r_max)
+        parts.append(f'<text x="{x + 3:.1f}" y="{y - 3:.1f}" font-size="11" fill="#888">{escape(str(lbl))}</text>')
+
+    # Libellés des catégories
+    for a, label in zip(angles, categories):
+        x, y = _point(a, r_max * 1.12, r_max, clamp=False)
+        parts.append(
+            f'<text x="{x:.1f}" y="{y:.1f}" text-anchor="{_anchor(a)}" dominant-baseline="middle" '
+            f'font-size="{label_size}" font-weight="bold" fill="{text_color}">{escape(str(label))}</text>'
+        )
+    return parts
+
+def _svg_series(values, r_max, color, fill_opacity, dash=None, markers=False):
+    angles = _angles(len(values))
+    pts = [_point(a, v or 0, r_max) for a, v in zip(angles, values)]
+    pts_str = " ".join(f"{x:.1f},{y:.1f}" for x, y in pts)
+    dash_attr = ' stroke-dasharray="8 5"' if dash else ""
+    fill = f'fill="{color}" fill-opacity="{fill_opacity}"' if fill_opacity else 'fill="none"'
+    parts = [f'<polygon points="{pts_str}" {fill} stroke="{color}" stroke-width="2.5"{dash_attr}/>']
+    if markers:
+        parts += [f'<circle cx="{x:.1f}" cy="{y:.1f}" r="4" fill="{color}"/>' for x, y in pts]
+    return parts
+
+def _svg_wrap(parts, legend=None):
+    legend_parts = []
+    if legend:
+        for i, (label, color, dash) in enumerate(legend):
+            y = 18 + i * 18
+            dash_attr = ' stroke-dasharray="6 4"' if dash else ""
+            legend_parts.append(f'<line x1="{SVG_WIDTH - 90}" y1="{y}" x2="{SVG_WIDTH - 65}" y2="{y}" stroke="{color}" stroke-width="2.5"{dash_attr}/>')
+            legend_parts.append(f'<text x="{SVG_WIDTH - 58}" y="{y}" dominant-baseline="middle" font-size="12" fill="white">{escape(label)}</text>')
+    body = "".join(parts + legend_parts)
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {SVG_WIDTH} {SVG_HEIGHT}" width="100%" '
+            f'font-family="Helvetica, Arial, sans-serif">{body}</svg>')
+
+
+def radar_svg(categories, values, text_color="black", zones=True, grid_color=None,
+              fill_opacity=0.4, markers=True):
+    """Radar percentile (0-100) en SVG. Mêmes paramètres visuels que la version matplotlib."""
+    if not categories: return ""
+    if grid_color is None: grid_color = "#ccc" if text_color == "black" else "#555"
+    grid_opacity = 1 if zones else 0.3
+    parts = _svg_frame(categories, 100, [33, 66, 100], ["33", "66", ""] if zones else [],
+                       text_color, grid_color, grid_opacity, zones, 13)
+    parts += _svg_series(values, 100, SDR_RED, fill_opacity, markers=markers)
+    return _svg_wrap(parts)
+
+def multi_radar_svg(categories, values_l, values_r, values_norm, max_val=5.0):
+    """Radar G/D/Objectif en SVG (équivalent de create_multi_radar_chart)."""
+    if not categories: return ""
+    parts = _svg_frame(categories, max_val, [1, 2, 3, 4], ["1", "2", "3", "4"],
+                       "white", "#444", 1, False, 12)
+    parts += _svg_series(values_l, max_val, "#3498DB", 0.1)
+    parts += _svg_series(values_r, max_val, "#E74C3C", 0.1)
+    parts += _svg_series(values_norm, max_val, "#2ECC71", 0, dash=True)
+    legend = [("Gauche", "#3498DB", False), ("Droite", "#E74C3C", False), ("Obj.", "#2ECC71", True)]
+    return _svg_wrap(parts, legend)
+
+
+def _closed_degrees(n):
+    degs = [i * 360.0 / n for i in range(n)]
+    return degs, degs + degs[:1]
+
+def _zone_trace(go, r_in, r_out, color, alpha):
+    steps = [i * 5 for i in range(73)]
+    r = [r_out] * len(steps) + [r_in] * len(steps)
+    theta = steps + steps[::-1]
+    rgb = tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+    return go.Scatterpolar(r=r, theta=theta, mode="lines", line=dict(width=0), fill="toself",
+                           fillcolor=f"rgba({rgb[0]}, {rgb[1]}, {rgb[2]}, {alpha})",
+                           hoverinfo="skip", showlegend=False)
+
+def radar_plotly(categories, values, text_color="white", zones=True, height=450):
+    """Radar percentile (0-100) en figure Plotly Scatterpolar pour la page Streamlit."""
+    import plotly.graph_objects as go
+
+    if not categories: return None
+    degs, degs_closed = _closed_degrees(len(categories))
+    grid_color = "#ccc" if text_color == "black" else "#555"
+
+    fig = go.Figure()
+    if zones:
+        fig.add_trace(_zone_trace(go, 0, 33, *ZONE_LOW))
+        fig.add_trace(_zone_trace(go, 66, 100, *ZONE_HIGH))
+
+    values_closed = list(values) + list(values[:1])
+    labels_closed = list(categories) + list(categories[:1])
+    fig.add_trace(go.Scatterpolar(
+        r=values_closed, theta=degs_closed, customdata=labels_closed,
+        mode="lines+markers", fill="toself",
+        line=dict(color=SDR_RED, width=2), marker=dict(size=7, color=SDR_RED),
+        fillcolor="rgba(215, 25, 32, 0.4)",
+        hovertemplate="<b>%{customdata}</b> : P%{r:.0f}<extra></extra>", showlegend=False
+    ))
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(range=[0, 100], tickvals=[33, 66, 100], ticktext=["33", "66", ""],
+                            tickfont=dict(color="#888", size=9), gridcolor=grid_color,
+                            griddash="dash", linecolor=grid_color, angle=0),
+            angularaxis=dict(tickvals=degs, ticktext=list(categories), direction="counterclockwise",
+                             rotation=0, tickfont=dict(color=text_color, size=12, weight="bold"),
+                             gridcolor=grid_color, linecolor=grid_color),
+            bgcolor="rgba(0,0,0,0)"
+        ),
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=60, r=60, t=30, b=30), height=height, showlegend=False
+    )
+    return fig
+
+def multi_radar_plotly(categories, values_l, values_r, values_norm, max_val=5.0, height=450):
+    """Radar G/D/Objectif en figure Plotly."""
+    import plotly.graph_objects as go
+
+    if not categories: return None
+    degs, degs_closed = _closed_degrees(len(categories))
+    fig = go.Figure()
+    for vals, name, color, dash, fill in [
+        (values_norm, "Obj.", "#2ECC71", "dash", None),
+        (values_l, "Gauche", "#3498DB", "solid", "rgba(52, 152, 219, 0.1)"),
+        (values_r, "Droite", "#E74C3C", "solid", "rgba(231, 76, 60, 0.1)"),
+    ]:
+        fig.add_trace(go.Scatterpolar(
+            r=list(vals) + list(vals[:1]), theta=degs_closed, name=name, mode="lines",
+            line=dict(color=color, width=2, dash=dash),
+            fill="toself" if fill else None, fillcolor=fill
+        ))
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(range=[0, max_val], tickvals=[1, 2, 3, 4], tickfont=dict(color="#888", size=8),
+                            gridcolor="#444", griddash="dash", linecolor="#444", angle=0),
+            angularaxis=dict(tickvals=degs, ticktext=list(categories), direction="counterclockwise",
+                             rotation=0, tickfont=dict(color="white", size=11, weight="bold"),
+                             gridcolor="#444", linecolor="#444"),
+            bgcolor="rgba(0,0,0,0)"
+        ),
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        legend=dict(font=dict(color="white", size=10)),
+        margin=dict(l=60, r=60, t=30, b=30), height=height
+    )
+    return fig
@@ -1,37 +1,37 @@
 import streamlit as st
 import pandas as pd
-import altair as alt
 import plotly.graph_objects as go
 import plotly.express as px
-import unicodedata
 import numpy as np
 
+from column_resolver import get_column_resolver
+from perf import timed
+from player_dataset import get_player_dataset, move_to_end
+from correlations import get_correlation_matrix, METHODS
+
 SDR_RED = "#D71920"
 
-# --- Fonctions Utilitaires ---
+# Au-delà de ce nombre de joueurs, la distribution est tracée en WebGL (Scattergl)
+WEBGL_THRESHOLD = 300
 
-def remove_accents(input_str):
-    if not isinstance(input_str, str): return str(input_str)
-    nfkd_form = unicodedata.normalize('NFKD', input_str)
-    return "".join([c for c in nfkd_form if not unicodedata.combining(c)])
+# --- Fonctions Utilitaires ---
 
 def find_column_in_df(df, label):
-    keywords = [remove_accents(label).lower()]
-    df_cols_clean = [remove_accents(str(c)).lower().strip() for c in df.columns]
-    
-    for k in keywords:
-        for idx, col_name in enumerate(df_cols_clean):
-            if k in col_name: return df.columns[idx]
-            
-    parts = label.split(" ")
-    if len(parts) > 1:
-        main_key = parts[0].lower()
-        for idx, col_name in enumerate(df_cols_clean):
-            if main_key in col_name: return df.columns[idx]
-    return None
+    # Même résolution que la page individuelle et le rapport
+    return get_column_resolver(df).find(label)
 
-def clean_numeric_series(series):
-    return pd.to_numeric(series, errors='coerce')
+def chart_frame(view, columns, col_poste=None):
+    """
+    Petit DataFrame d'un graphique : Joueur, colonnes demandées ({nom: colonne de la vue})
+    et poste, lignes incomplètes retirées. La vue partagée n'est jamais modifiée.
+    """
+    data = {'Joueur': view['Joueur']}
+    data.update({name: view[col] for name, col in columns.items()})
+    if col_poste: data[col_poste] = view[col_poste]
+    return pd.DataFrame(data).dropna(subset=list(columns) + ['Joueur'])
+
+def format_corr(r):
+    return "-" if r is None else f"{r:+.2f}"
 
 def is_inverted_metric(label):
     keywords = ['temps', 'chrono', '10m', '505', 'agilité', 'masse grasse', 'landing']
@@ -79,6 +79,7 @@ def get_unit(label):
 
 # --- Page Principale ---
 
+@timed()
 def show_team_page(df, structure_dict):
     st.markdown(f"<h2 style='color:{SDR_RED}; border-bottom:1px solid {SDR_RED}; padding-bottom:5px;'>ANALYSE COLLECTIVE</h2>", unsafe_allow_html=True)
     
@@ -86,6 +87,8 @@ def show_team_page(df, structure_dict):
         st.warning("Aucune donnée disponible.")
         return
 
+    dataset = get_player_dataset(df)
+
     # Gestion de l'état (Session State)
     if 'selected_player_profiling' not in st.session_state:
         st.session_state.selected_player_profiling = None
@@ -110,13 +113,10 @@ def show_team_page(df, structure_dict):
         st.error("Données introuvables.")
         return
 
-    # Préparation des données globales
-    df_main = df.copy()
-    if col_poste and sel_poste:
-        df_main = df_main[df_main[col_poste].isin(sel_poste)]
+    # Vue numérique filtrée par postes, partagée par les trois graphiques (mise en cache)
+    view = dataset.position_view(sel_poste if col_poste else None)
 
-    df_main['Valeur_Clean'] = clean_numeric_series(df_main[col_name])
-    df_main = df_main.dropna(subset=['Valeur_Clean', 'Joueur'])
+    df_main = chart_frame(view, {'Valeur_Clean': col_name}, col_poste)
     
     inverted = is_inverted_metric(metric_sel)
     avg_val = df_main['Valeur_Clean'].mean()
@@ -184,13 +184,7 @@ def show_team_page(df, structure_dict):
     col_y_sc = find_column_in_df(df, scat_y)
 
     if col_x_sc and col_y_sc:
-        df_scatter = df.copy()
-        if col_poste and sel_poste:
-            df_scatter = df_scatter[df_scatter[col_poste].isin(sel_poste)]
-            
-        df_scatter['Val_X'] = clean_numeric_series(df_scatter[col_x_sc])
-        df_scatter['Val_Y'] = clean_numeric_series(df_scatter[col_y_sc])
-        df_scatter = df_scatter.dropna(subset=['Val_X', 'Val_Y'])
+        df_scatter = chart_frame(view, {'Val_X': col_x_sc, 'Val_Y': col_y_sc}, col_poste)
         
         if not df_scatter.empty:
             mean_x = df_scatter['Val_X'].mean()
@@ -214,6 +208,27 @@ def show_team_page(df, structure_dict):
             )
             st.plotly_chart(fig_scatter, use_container_width=True)
 
+        # Corrélations calculées une fois par jeu de données et sélection de postes
+        corr = get_correlation_matrix(df, all_kpis_flat, sel_poste if col_poste else None)
+        if scat_x in corr.labels and scat_y in corr.labels:
+            r_p, r_s, n_pair = corr.pair(scat_x, scat_y)
+            st.caption(f"Corrélation : Pearson r = {format_corr(r_p)} · Spearman ρ = {format_corr(r_s)} · n = {n_pair} joueurs")
+
+        with st.expander("🧮 Matrice de corrélation (tous les indicateurs)", expanded=False):
+            method = st.radio("Méthode", list(METHODS), format_func=METHODS.get, horizontal=True, key="corr_method")
+            matrix = corr.matrix(method)
+            fig_corr = go.Figure(go.Heatmap(
+                z=matrix.to_numpy(), x=corr.labels, y=corr.labels,
+                customdata=corr.counts.to_numpy(),
+                zmin=-1, zmax=1, colorscale="RdBu_r",
+                hovertemplate="%{y} / %{x}<br>r = %{z:.2f}<br>n = %{customdata}<extra></extra>"
+            ))
+            fig_corr.update_layout(height=700, template="simple_white", margin=dict(l=20, r=20, t=20, b=20),
+                                   yaxis=dict(autorange="reversed"))
+            st.plotly_chart(fig_corr, use_container_width=True)
+            st.markdown("**Paires les plus corrélées**")
+            st.dataframe(corr.strongest_pairs(method), use_container_width=True, hide_index=True)
+
     st.markdown("---")
 
     st.subheader("Distribution des joueurs (Boite à moustache)")
@@ -224,12 +239,7 @@ def show_team_page(df, structure_dict):
 
     if col_dist:
         # Données
-        df_viz = df.copy()
-        if col_poste and sel_poste:
-            df_viz = df_viz[df_viz[col_poste].isin(sel_poste)]
-        
-        df_viz['Valeur'] = clean_numeric_series(df_viz[col_dist])
-        df_viz = df_viz.dropna(subset=['Valeur', 'Joueur'])
+        df_viz = chart_frame(view, {'Valeur': col_dist})
 
         if not df_viz.empty:
             unit_d = get_unit(dist_kpi)
@@ -265,39 +275,24 @@ def show_team_page(df, structure_dict):
                  current_selection = manual_sel
                  st.session_state.selected_player_profiling = manual_sel
 
-            # Tri
-            df_viz['SortOrder'] = df_viz['Joueur'].apply(lambda x: 1 if x == current_selection else 0)
-            df_viz = df_viz.sort_values('SortOrder', ascending=True)
-
-            # Couleurs
-            colors = []
-            sizes = []
-            opacities = []
-            lines_width = []
-            lines_color = []
-
-            for p in df_viz['Joueur']:
-                if p == current_selection:
-                    colors.append(SDR_RED)
-                    sizes.append(25)
-                    opacities.append(1.0)
-                    lines_width.append(2)
-                    lines_color.append('black')
-                else:
-                    colors.append("#888888")
-                    sizes.append(12)
-                    opacities.append(0.6)
-                    lines_width.append(1)
-                    lines_color.append('white')
-
-            df_viz['Color'] = colors
-            df_viz['Size'] = sizes
-            df_viz['Opacity'] = opacities
+            # Joueur sélectionné tracé en dernier (au premier plan)
+            label_sel = dataset.label(current_selection)
+            df_viz = move_to_end(df_viz, label_sel)
+
+            # Style vectorisé (masque du joueur sélectionné)
+            is_sel = df_viz.index == label_sel
+            colors = np.where(is_sel, SDR_RED, "#888888")
+            sizes = np.where(is_sel, 25, 12)
+            opacities = np.where(is_sel, 1.0, 0.6)
+            lines_width = np.where(is_sel, 2, 1)
+            lines_color = np.where(is_sel, 'black', 'white')
             
             # --- FIGURE ---
             fig_interactive = go.Figure()
 
-            fig_interactive.add_trace(go.Scatter(
+            # WebGL pour les grands effectifs (même sélection au clic)
+            scatter_cls = go.Scattergl if len(df_viz) > WEBGL_THRESHOLD else go.Scatter
+            fig_interactive.add_trace(scatter_cls(
                 x=df_viz['Valeur'],
                 y=df_viz['Y_Jitter'], 
                 mode='markers',
@@ -349,9 +344,9 @@ def show_team_page(df, structure_dict):
 
             sel_p = st.session_state.selected_player_profiling
             if sel_p:
-                player_row = df_viz[df_viz['Joueur'] == sel_p]
-                if not player_row.empty:
-                    val_p = player_row['Valeur'].iloc[0]
+                label_p = dataset.label(sel_p)
+                if label_p is not None and label_p in df_viz.index:
+                    val_p = df_viz.at[label_p, 'Valeur']
                     diff = val_p - mean_val
                     
                     st.markdown(f"<h3 style='text-align: center; color:{SDR_RED};'>{sel_p}</h3>", unsafe_allow_html=True)
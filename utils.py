@@ -1,12 +1,18 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import base64
 import os
 from io import BytesIO
 from math import pi
 
+from data_cache import load_profiling_workbook
+from chart_cache import cached_chart
+from radar_render import radar_svg, radar_plotly
+import assets
+from cmj_store import get_cmj_store, CMJ_MASTER_CSV
+from perf import timed
+
 # =============================================================================
 # 1. CONSTANTES & CONFIGURATION
 # =============================================================================
@@ -36,40 +42,12 @@ def local_css():
 # =============================================================================
 
 def img_to_b64(image_path):
-    """Convertit une image locale en chaîne base64 pour l'intégrer au HTML."""
-    if not image_path or not os.path.exists(image_path):
-        return ""
-    try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except Exception as e:
-        return ""
+    """Convertit une image locale en chaîne base64 pour l'intégrer au HTML (encodée une fois)."""
+    return assets.get_asset_b64(image_path)
 
 def get_best_photo_path(player_name):
-    """Cherche la photo du joueur dans le dossier Photos."""
-    folder = "Photos"
-    if not os.path.exists(folder): return None
-    
-    # Création d'un map {nom_fichier_lower: nom_fichier_reel}
-    files_map = {f.lower(): f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f))}
-    
-    clean_name = player_name.strip()
-    parts = clean_name.split()
-    
-    # Stratégies de recherche (Nom complet, Nom Prénom, Prénom Nom)
-    candidates = [clean_name]
-    if len(parts) > 1:
-        candidates.append(f"{parts[-1]} {' '.join(parts[:-1])}") # NOM Prénom
-        candidates.append(f"{' '.join(parts[1:])} {parts[0]}")   # Prénom NOM
-    
-    extensions = [".jpg", ".png", ".jpeg"]
-    
-    for cand in candidates:
-        for ext in extensions:
-            target_key = f"{cand}{ext}".lower()
-            if target_key in files_map:
-                return os.path.join(folder, files_map[target_key])
-    return None
+    """Cherche la photo du joueur dans le dossier Photos (index mis en cache)."""
+    return assets.get_best_photo_path(player_name)
 
 # =============================================================================
 # 3. LOGIQUE MÉTIER & CALCULS
@@ -80,6 +58,17 @@ def is_inverted(label):
     keywords = ['temps', 'chrono', '10m', '505', 'agilité', 'masse grasse', 'landing', "Landing %"]
     return any(x in str(label).lower() for x in keywords)
 
+def load_cmj_data(path=CMJ_MASTER_CSV, metrics=None):
+    """
+    Importe le CSV CMJ local dans la base des essais (une seule lecture par contenu de fichier).
+    metrics : colonnes à conserver (toutes si None).
+    Retourne la base (get_cmj_store) si le fichier existe, sinon None.
+    """
+    if not os.path.exists(path): return None
+    store = get_cmj_store()
+    store.ingest(path, metrics=metrics)
+    return store
+
 @st.cache_data
 def load_data():
     """Charge les données principales (utilisé par main.py)."""
@@ -89,17 +78,9 @@ def load_data():
     for f in files:
         if os.path.exists(f):
             try:
-                df = pd.read_excel(f, header=0)
-                # Nettoyage des colonnes (supprime les espaces avant/après)
-                df.columns = [str(c).strip() for c in df.columns]
-                
-                # Identification de la colonne Joueur
-                cols_lower = {str(c).lower().strip(): c for c in df.columns}
-                target = next((cols_lower[k] for k in ['joueur', 'nom', 'name'] if k in cols_lower), None)
-                
-                if target:
-                    df = df.dropna(subset=[target]).rename(columns={target: 'Joueur'})
-                    df['Joueur'] = df['Joueur'].astype(str).str.title().str.strip()
+                # Lecture via le cache Parquet (colonnes strippées, 'Joueur' normalisé)
+                df = load_profiling_workbook(f, strip_columns=True)
+                if df is not None:
                     return df
             except Exception:
                 continue
@@ -110,14 +91,23 @@ def load_data():
 # 4. GÉNÉRATION DE GRAPHIQUES (RADAR)
 # =============================================================================
 
-def create_radar_chart(categories, values, text_color="black"):
+@timed("radar")
+@cached_chart
+def create_radar_chart(categories, values, text_color="black", backend="png"):
     """
     Génère un Radar Chart et retourne l'image en Base64.
     text_color: 'white' pour l'app Streamlit (fond sombre), 'black' pour le PDF (fond blanc).
+    backend: 'png' (base64 matplotlib), 'svg' (chaîne SVG) ou 'plotly' (figure Scatterpolar).
     """
     if not categories or not values:
         return ""
 
+    if backend == "svg":
+        return radar_svg(categories, values, text_color=text_color, zones=False,
+                         grid_color=text_color, fill_opacity=0.25, markers=False)
+    if backend == "plotly":
+        return radar_plotly(categories, values, text_color=text_color, zones=False)
+
     N = len(categories)
     
     # Calcul des angles
@@ -129,6 +119,7 @@ def create_radar_chart(categories, values, text_color="black"):
     
     # Création de la figure
     # Facecolor transparent pour s'adapter au fond
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots(figsize=(4, 4), subplot_kw=dict(polar=True))
     fig.patch.set_alpha(0)
     ax.set_facecolor((0,0,0,0)) # Fond du plot transparent